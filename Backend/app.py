@@ -1,19 +1,31 @@
 # app.py - Main Flask Application
-from flask import Flask
+from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 import os
+import json
+import click
 from datetime import timedelta
 
 from config.database import init_db
 from routes.auth_routes import auth_bp
 from routes.contract_routes import contract_bp
 from routes.upload_routes import upload_bp
+from services.blob_store import BlobStore
+from services.bulk_generation import generate_bulk_zip, rows_from_csv
+from services.document_enhancement import FAST_MODE, ENHANCED_MODE
+from services.render_cache import RenderCache
+from services.storage_sweeper import StorageSweeper, start_sweeper
+from document_generator.template_renderer import TEMPLATES
+from services.upload_ingest import IngestRequest, UploadRejected
+from utils.metrics import METRICS
+from services.model_router import ROUTER
 from dotenv import load_dotenv
 load_dotenv()
 
 def create_app():
     app = Flask(__name__)
+    app.request_class = IngestRequest
     
     # Configuration
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
@@ -21,9 +33,39 @@ def create_app():
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
     app.config['UPLOAD_FOLDER'] = os.path.join(os.getcwd(), 'uploads')
     app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB
+    app.config['MAX_UPLOAD_FILE_SIZE'] = int(os.getenv('MAX_UPLOAD_FILE_SIZE', 16 * 1024 * 1024))
+    # Batch uploads (many files or a ZIP archive per request) get a larger body limit
+    app.config['BATCH_MAX_CONTENT_LENGTH'] = int(os.getenv('BATCH_MAX_CONTENT_LENGTH', 512 * 1024 * 1024))
+    # Ephemeral uploads (ad-hoc summaries) stay in memory up to this size, then spill to a temp file
+    app.config['EPHEMERAL_SPOOL_MAX_MEMORY'] = int(os.getenv('EPHEMERAL_SPOOL_MAX_MEMORY', 4 * 1024 * 1024))
+    app.config['COMPARE_DEADLINE_SECONDS'] = int(os.getenv('COMPARE_DEADLINE_SECONDS', 60))
+    app.config['SUMMARY_PREGENERATE'] = os.getenv('SUMMARY_PREGENERATE', 'false').lower() == 'true'
+
+    # Download acceleration: '' serves files from the worker, 'x-accel-redirect' (nginx)
+    # or 'x-sendfile' (Apache/lighttpd) hand the transfer to the front proxy
+    app.config['DOWNLOAD_ACCEL'] = os.getenv('DOWNLOAD_ACCEL', '')
+    app.config['DOWNLOAD_ACCEL_PREFIX'] = os.getenv('DOWNLOAD_ACCEL_PREFIX', '/protected/uploads')
+    
+    app.config['BLOB_STORE_FOLDER'] = os.path.join(app.config['UPLOAD_FOLDER'], 'blobs')
+    # Generated documents wait here for their signed, expiring download link
+    app.config['GENERATED_DOCS_FOLDER'] = os.path.join(app.config['UPLOAD_FOLDER'], 'generated')
+    app.config['GENERATED_DOC_TTL_MINUTES'] = int(os.getenv('GENERATED_DOC_TTL_MINUTES', 30))
+    # Public origin of this API for absolute download links (e.g. behind a proxy); empty uses the request host
+    app.config['PUBLIC_BASE_URL'] = os.getenv('PUBLIC_BASE_URL', '')
+    # Rendered .docx files keyed by the hash of their final JSON
+    app.config['RENDER_CACHE_FOLDER'] = os.path.join(app.config['UPLOAD_FOLDER'], 'render_cache')
+    # Background sweeper: expires generated files, clears stale upload spools and keeps
+    # generated documents plus rendered files under the quota (interval 0 disables it)
+    app.config['STORAGE_SWEEP_INTERVAL_SECONDS'] = int(os.getenv('STORAGE_SWEEP_INTERVAL_SECONDS', 300))
+    app.config['GENERATED_STORAGE_QUOTA_BYTES'] = int(os.getenv('GENERATED_STORAGE_QUOTA_BYTES', 1024 * 1024 * 1024))
+    app.config['TEMP_UPLOAD_MAX_AGE_SECONDS'] = int(os.getenv('TEMP_UPLOAD_MAX_AGE_SECONDS', 60 * 60))
     
     # Create upload directory
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    os.makedirs(app.config['BLOB_STORE_FOLDER'], exist_ok=True)
+    os.makedirs(app.config['GENERATED_DOCS_FOLDER'], exist_ok=True)
+    os.makedirs(app.config['RENDER_CACHE_FOLDER'], exist_ok=True)
+    app.extensions['storage_sweeper'] = start_sweeper(app)
     
     # Initialize extensions
     CORS(app, origins=["http://localhost:5173"])
@@ -37,9 +79,51 @@ def create_app():
     app.register_blueprint(contract_bp, url_prefix='/api/contracts')
     app.register_blueprint(upload_bp, url_prefix='/api/upload')
     
+    @app.errorhandler(UploadRejected)
+    def upload_rejected(e):
+        return jsonify({'error': e.message}), e.status_code
+    
     @app.route('/api/health')
     def health():
         return {'status': 'healthy'}
+
+    @app.route('/api/metrics')
+    def metrics():
+        return jsonify(dict(METRICS.snapshot(), routes=ROUTER.stats()))
+
+    @app.cli.command('gc-blobs')
+    def gc_blobs():
+        """Remove uploaded blobs no contract references any more"""
+        stats = BlobStore(app.config['BLOB_STORE_FOLDER']).collect_garbage()
+        print(f"Blob GC: scanned {stats['scanned']}, removed {stats['removed']} "
+              f"({stats['removed_bytes']} bytes), temp files removed {stats['temp_removed']}")
+
+    @app.cli.command('sweep-storage')
+    def sweep_storage():
+        """Run one expiry and disk-quota pass over generated files now"""
+        print(f"Storage sweep: {StorageSweeper.from_app(app).run_once()}")
+
+    @app.cli.command('generate-bulk')
+    @click.argument('document_type')
+    @click.argument('input_path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--output', '-o', default=None, help='ZIP file to write (default: <document_type>_bulk.zip)')
+    @click.option('--mode', type=click.Choice([FAST_MODE, ENHANCED_MODE]), default=FAST_MODE)
+    def generate_bulk(document_type, input_path, output, mode):
+        """Generate one document per row of a CSV file or object of a JSON list"""
+        template = TEMPLATES.get(document_type.lower())
+        if template is None:
+            raise click.ClickException(f"Unknown document type: {document_type}")
+        with open(input_path, 'rb') as input_file:
+            data = input_file.read()
+        items = rows_from_csv(data) if input_path.lower().endswith('.csv') else json.loads(data)
+        if isinstance(items, dict):
+            items = items.get('items', [])
+        output = output or f"{document_type.lower()}_bulk.zip"
+        with open(output, 'wb') as archive:
+            for chunk in generate_bulk_zip(template, document_type.lower(), items,
+                                           RenderCache(app.config['RENDER_CACHE_FOLDER']), mode):
+                archive.write(chunk)
+        print(f"Wrote {len(items)} documents to {output} (see manifest.json for per-document status)")
     
     return app
 
@@ -0,0 +1,79 @@
+# benchmarks/bench_template_render.py - Template Rendering Micro-Benchmark
+"""
+Compares the original per-request template handling (read + json.load the
+template, then re.findall and str.replace on every string node) with the
+preloaded, compiled render plan.
+
+    python benchmarks/bench_template_render.py [--iterations 2000]
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from document_generator.template_renderer import TEMPLATES, TEMPLATE_FILES, TEMPLATES_DIR, resolve_path
+
+
+def legacy_replace_placeholders(text, input_data):
+    """DocumentGenerator.replace_placeholders as it was before compilation"""
+    if not isinstance(text, str):
+        return text
+    placeholders = re.findall(r'\{\{([^}]+)\}\}', text)
+    for placeholder in placeholders:
+        value = resolve_path(input_data, placeholder)
+        if value is not None:
+            text = text.replace(f'{{{{{placeholder}}}}}', str(value))
+    return text
+
+
+def legacy_render(node, input_data):
+    if isinstance(node, dict):
+        return {key: legacy_render(value, input_data) for key, value in node.items()}
+    if isinstance(node, list):
+        return [legacy_render(value, input_data) for value in node]
+    return legacy_replace_placeholders(node, input_data)
+
+
+def legacy_request(path, input_data):
+    with open(path, 'r', encoding='utf-8') as f:
+        template_json = json.load(f)
+    return legacy_render(template_json, input_data)
+
+
+def sample_input(template):
+    """Input data filling every placeholder slot of a template"""
+    data = {}
+    for path in template.slots:
+        keys = path.split('.')
+        current = data
+        for key in keys[:-1]:
+            current = current.setdefault(key, {})
+        if isinstance(current, dict):
+            current[keys[-1]] = f"Sample {keys[-1].replace('_', ' ')}"
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'template':<20}{'slots':>7}{'legacy us':>12}{'compiled us':>13}{'speedup':>9}")
+    for document_type, template in TEMPLATES.templates.items():
+        path = os.path.join(TEMPLATES_DIR, TEMPLATE_FILES[document_type])
+        input_data = sample_input(template)
+        assert legacy_request(path, input_data) == template.render(input_data)
+
+        legacy = timeit.timeit(lambda: legacy_request(path, input_data), number=args.iterations)
+        compiled = timeit.timeit(lambda: TEMPLATES.get(document_type).render(input_data), number=args.iterations)
+        print(f"{document_type:<20}{len(template.slots):>7}"
+              f"{legacy / args.iterations * 1e6:>12.1f}{compiled / args.iterations * 1e6:>13.1f}"
+              f"{legacy / compiled:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/bench_txt_extract.py - Plain-Text Extraction Benchmark
+"""
+Compares whole-file chardet detection with the UTF-8 fast path and sampled
+chardet fallback on large generated plain-text exports.
+
+    python benchmarks/bench_txt_extract.py [--megabytes 4] [--iterations 3]
+"""
+import io
+import os
+import sys
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chardet
+from services.text_extractor import extract_text_from_txt
+
+LINE = "12.{n} The Supplier warrants that the Services will be performed with reasonable skill and care. — Café Müller GmbH\n"
+
+
+def legacy_extract(stream):
+    """extract_text_from_txt before sampling: chardet over the whole body"""
+    raw_data = stream.read()
+    encoding = chardet.detect(raw_data).get('encoding') or 'utf-8'
+    content = raw_data.decode(encoding, errors='ignore').replace('\r\n', '\n').replace('\r', '\n')
+    lines = [line.strip() for line in content.split('\n') if line.strip()]
+    return '\n'.join(lines) if lines else None
+
+
+def build_text(megabytes):
+    lines = []
+    size = 0
+    while size < megabytes * 1024 * 1024:
+        line = LINE.format(n=len(lines))
+        lines.append(line)
+        size += len(line)
+    return ''.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--megabytes', type=float, default=4)
+    parser.add_argument('--iterations', type=int, default=3)
+    args = parser.parse_args()
+
+    text = build_text(args.megabytes)
+    print(f"{'encoding':<12}{'legacy ms':>12}{'sampled ms':>12}{'speedup':>9}")
+    for encoding in ('utf-8', 'utf-8-sig', 'cp1252', 'utf-16'):
+        data = text.encode(encoding)
+        expected = '\n'.join(line.strip() for line in text.splitlines())
+        assert extract_text_from_txt(io.BytesIO(data)) == expected
+
+        legacy = timeit.timeit(lambda: legacy_extract(io.BytesIO(data)), number=args.iterations)
+        sampled = timeit.timeit(lambda: extract_text_from_txt(io.BytesIO(data)), number=args.iterations)
+        print(f"{encoding:<12}{legacy / args.iterations * 1000:>12.1f}"
+              f"{sampled / args.iterations * 1000:>12.1f}{legacy / sampled:>8.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
+import io
+import hashlib
 import json
-import re
 import os
 import threading
 import time
@@ -13,6 +14,11 @@ from docx.shared import Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml.shared import OxmlElement, qn
 
+try:
+    from document_generator.template_renderer import compile_text, resolve_path
+except ImportError:  # run as a script from inside document_generator/
+    from template_renderer import compile_text, resolve_path
+
 
 class TemporaryFileServer:
     """Creates a temporary HTTP server to serve generated documents."""
@@ -190,8 +196,57 @@ class TemporaryFileServer:
         return f"http://localhost:{self.port}"
 
 
+# Optional pre-styled starting document; without it a default document with our margins is used
+BASE_DOCX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'base.docx')
+
+_base_docx = None
+_base_docx_digest = None
+_base_docx_lock = threading.Lock()
+
+
+def apply_page_setup(doc):
+    """Page margins every generated document uses."""
+    for section in doc.sections:
+        section.top_margin = Inches(1)
+        section.bottom_margin = Inches(1)
+        section.left_margin = Inches(1)
+        section.right_margin = Inches(1)
+
+
+def base_docx_bytes():
+    """Bytes of the styled base document, loaded or built once per process."""
+    global _base_docx
+    if _base_docx is None:
+        with _base_docx_lock:
+            if _base_docx is None:
+                if os.path.exists(BASE_DOCX_PATH):
+                    with open(BASE_DOCX_PATH, 'rb') as f:
+                        _base_docx = f.read()
+                else:
+                    doc = Document()
+                    apply_page_setup(doc)
+                    buffer = io.BytesIO()
+                    doc.save(buffer)
+                    _base_docx = buffer.getvalue()
+    return _base_docx
+
+
+def base_docx_digest():
+    """SHA-256 of the base document, so renders from an edited base.docx are not reused."""
+    global _base_docx_digest
+    if _base_docx_digest is None:
+        _base_docx_digest = hashlib.sha256(base_docx_bytes()).hexdigest()
+    return _base_docx_digest
+
+
+def document_filename(document_type):
+    """Timestamped .docx name for a document type."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"{document_type.replace(' ', '_')}_{timestamp}.docx"
+
+
 class DocumentGenerator:
-    def __init__(self, combined_json_file=None, combined_json_data=None, enable_server=True):
+    def __init__(self, combined_json_file=None, combined_json_data=None, enable_server=False):
         """Initialize the document generator with combined JSON containing structure and input data."""
         if combined_json_data:
             self.combined_data = combined_json_data
@@ -205,7 +260,10 @@ class DocumentGenerator:
         self.input_data = self.combined_data.get('input_data', {})
         self.document_type = self.combined_data.get('document_type', 'Document')
         
-        self.doc = Document()
+        # Clone the preloaded base document; it already carries styles and margins
+        self.doc = Document(io.BytesIO(base_docx_bytes()))
+        # Placeholder values resolved so far; each path is looked up once per document
+        self._values = {}
         self.enable_server = enable_server
         self.file_server = None
         
@@ -214,8 +272,6 @@ class DocumentGenerator:
             if not self.file_server.start_server():
                 print("Warning: Could not start file server. Download URLs will not be available.")
                 self.file_server = None
-        
-        self.setup_document()
     
     def load_json(self, file_path):
         """Load JSON data from file."""
@@ -226,28 +282,24 @@ class DocumentGenerator:
         """Set up document formatting based on structure JSON."""
         formatting = self.structure.get('formatting', {})
         
-        # Set margins
-        sections = self.doc.sections
-        for section in sections:
-            section.top_margin = Inches(1)
-            section.bottom_margin = Inches(1)
-            section.left_margin = Inches(1)
-            section.right_margin = Inches(1)
+        # Set margins (already applied to the base document)
+        apply_page_setup(self.doc)
     
     def replace_placeholders(self, text):
         """Replace placeholders in text with actual values from input data."""
         if not isinstance(text, str):
             return text
         
-        # Find all placeholders in the format {{key}} or {{nested.key}}
-        placeholders = re.findall(r'\{\{([^}]+)\}\}', text)
-        
-        for placeholder in placeholders:
-            value = self.get_nested_value(self.input_data, placeholder)
-            if value is not None:
-                text = text.replace(f'{{{{{placeholder}}}}}', str(value))
-        
-        return text
+        # Strings are split into literal parts and {{key}} / {{nested.key}} paths once per process
+        compiled = compile_text(text)
+        if compiled is None:
+            return text
+        return compiled.render(self._lookup)
+    
+    def _lookup(self, key_path):
+        if key_path not in self._values:
+            self._values[key_path] = resolve_path(self.input_data, key_path)
+        return self._values[key_path]
     
     def get_nested_value(self, data, key_path):
         """Get value from nested dictionary using dot notation."""
@@ -404,16 +456,14 @@ class DocumentGenerator:
             # Add spacing between signature blocks
             self.doc.add_paragraph()
     
-    def generate_document(self, output_file=None, expiry_minutes=30):
-        """Generate the complete document and create download URL."""
+    def default_filename(self):
+        """Timestamped .docx name for this document type."""
+        return document_filename(self.document_type)
+    
+    def build_document(self):
+        """Add every configured part of the structure to the document."""
         structure_data = self.structure
         
-        # Generate unique filename if not provided
-        if output_file is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            doc_type = self.document_type.replace(' ', '_')
-            output_file = f"{doc_type}_{timestamp}.docx"
-        
         # Add title
         if 'title' in structure_data:
             self.add_title(structure_data['title'])
@@ -436,6 +486,21 @@ class DocumentGenerator:
         # Add signature section
         if 'signature_section' in structure_data:
             self.add_signature_section(structure_data['signature_section'])
+    
+    def render_to_bytes(self):
+        """Render the document into memory and return the .docx bytes (no file, no server)."""
+        self.build_document()
+        buffer = io.BytesIO()
+        self.doc.save(buffer)
+        return buffer.getvalue()
+    
+    def generate_document(self, output_file=None, expiry_minutes=30):
+        """Generate the complete document and create download URL."""
+        # Generate unique filename if not provided
+        if output_file is None:
+            output_file = self.default_filename()
+        
+        self.build_document()
         
         # Save document
         self.doc.save(output_file)
@@ -482,6 +547,19 @@ class DocumentGenerator:
                 print("🛑 Server stopped - no more files to serve")
 
 
+def render_document_job(index, combined_json_data):
+    """Render one document in memory; picklable entry point for process pools.
+    
+    Returns (index, docx bytes or None, error message or None, seconds taken).
+    """
+    started = time.perf_counter()
+    try:
+        data = DocumentGenerator(combined_json_data=combined_json_data).render_to_bytes()
+        return index, data, None, time.perf_counter() - started
+    except Exception as e:
+        return index, None, f"{type(e).__name__}: {e}", time.perf_counter() - started
+
+
 def main():
     """Main function to run the document generator."""
     try:
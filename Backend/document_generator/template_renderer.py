@@ -0,0 +1,141 @@
+# document_generator/template_renderer.py - Compiled Template Rendering
+import os
+import re
+import json
+import hashlib
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+# Document types accepted by the generate endpoint and the template file each one uses
+TEMPLATE_FILES = {
+    "nda": "nda_templates.json",
+    "sow": "sow_templates.json",
+    "service-agreement": "service_agreement_template.json",
+    "freelancer-agreement": "freelancer_agreement_template.json"
+}
+
+PLACEHOLDER_PATTERN = re.compile(r'\{\{([^}]+)\}\}')
+
+
+def resolve_path(data, key_path: str):
+    """Value at a dotted path in nested dictionaries, or None"""
+    current = data
+    for key in key_path.split('.'):
+        if isinstance(current, dict) and key in current:
+            current = current[key]
+        else:
+            return None
+    return current
+
+
+def fill_parts(parts, value_of, path_of) -> str:
+    """Join literal parts with the values of the placeholders between them.
+
+    ``parts`` alternates literal, placeholder, literal, ..., literal; a
+    placeholder whose value is None renders as ``{{path}}``.
+    """
+    out = [parts[0]]
+    for index in range(1, len(parts), 2):
+        value = value_of(parts[index])
+        out.append('{{' + path_of(parts[index]) + '}}' if value is None else str(value))
+        out.append(parts[index + 1])
+    return ''.join(out)
+
+
+class CompiledText:
+    """A string split once into literal parts and placeholder paths.
+
+    ``parts`` alternates literal, path, literal, ..., literal, so rendering is
+    a single join; a placeholder whose value is missing renders as itself.
+    """
+
+    __slots__ = ('parts',)
+
+    def __init__(self, parts: Tuple[str, ...]):
+        self.parts = parts
+
+    def render(self, lookup) -> str:
+        return fill_parts(self.parts, lookup, str)
+
+
+@lru_cache(maxsize=8192)
+def compile_text(text: str) -> Optional[CompiledText]:
+    """Compiled form of a string, or None when it has no placeholders"""
+    parts = PLACEHOLDER_PATTERN.split(text)
+    return CompiledText(tuple(parts)) if len(parts) > 1 else None
+
+
+class CompiledTemplate:
+    """A template JSON document compiled into a render plan.
+
+    Every distinct placeholder path gets a slot index; string nodes are
+    pre-split into literal parts and slot indexes. ``render`` resolves each
+    slot once against the input data and then fills the plan in one pass.
+    ``template_json`` is shared between requests and must not be mutated.
+    """
+
+    def __init__(self, name: str, template_json: Dict):
+        self.name = name
+        self.template_json = template_json
+        # Identifies the template content, so cached enhancements end when a template is edited
+        self.digest = hashlib.sha256(json.dumps(template_json, sort_keys=True).encode('utf-8')).hexdigest()
+        self.slots: List[str] = []
+        self._slot_index: Dict[str, int] = {}
+        self.plan = self._compile(template_json)
+
+    def _slot(self, path: str) -> int:
+        index = self._slot_index.get(path)
+        if index is None:
+            index = self._slot_index[path] = len(self.slots)
+            self.slots.append(path)
+        return index
+
+    def _compile(self, node):
+        if isinstance(node, dict):
+            return ('dict', [(key, self._compile(value)) for key, value in node.items()])
+        if isinstance(node, list):
+            return ('list', [self._compile(value) for value in node])
+        if isinstance(node, str):
+            parts = PLACEHOLDER_PATTERN.split(node)
+            if len(parts) == 1:
+                return ('value', node)
+            # Odd positions are placeholder paths; store their slot index instead
+            return ('text', tuple(self._slot(part) if i % 2 else part for i, part in enumerate(parts)))
+        return ('value', node)
+
+    def render(self, input_data: Dict) -> Dict:
+        """Template with placeholders filled from ``input_data`` (missing values stay as placeholders)"""
+        values = [resolve_path(input_data, path) for path in self.slots]
+        return self._fill(self.plan, values)
+
+    def _fill(self, plan, values):
+        kind, body = plan
+        if kind == 'value':
+            return body
+        if kind == 'text':
+            return fill_parts(body, values.__getitem__, self.slots.__getitem__)
+        if kind == 'dict':
+            return {key: self._fill(child, values) for key, child in body}
+        return [self._fill(child, values) for child in body]
+
+
+class TemplateRegistry:
+    """All document templates, read and compiled once per process"""
+
+    def __init__(self, templates_dir: str = TEMPLATES_DIR):
+        self.templates: Dict[str, CompiledTemplate] = {}
+        for document_type, filename in TEMPLATE_FILES.items():
+            path = os.path.join(templates_dir, filename)
+            if not os.path.exists(path):
+                print(f"[Templates] {document_type}: {filename} not found, type disabled")
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                self.templates[document_type] = CompiledTemplate(document_type, json.load(f))
+
+    def get(self, document_type: str) -> Optional[CompiledTemplate]:
+        return self.templates.get(document_type)
+
+
+TEMPLATES = TemplateRegistry()
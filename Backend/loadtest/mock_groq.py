@@ -0,0 +1,262 @@
+# loadtest/mock_groq.py - Local Stand-In for the Groq Chat Completions API
+"""
+Serves the OpenAI-compatible ``/openai/v1/chat/completions`` endpoint with
+canned JSON for each GroqClient task, so the upload, compare, summarize and
+generate flows can be load-tested without spending API quota.
+
+Point the backend at it with ``GROQ_BASE_URL=http://localhost:8900/openai/v1``
+(any non-empty ``GROQ_API_KEY`` is accepted).
+
+    python loadtest/mock_groq.py --latency-dist lognormal --latency-ms 800 --error-rate 0.02
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_RESPONSES = {
+    'analyze_contract_risk': {
+        "overall_risk_score": 58,
+        "summary": "Mock analysis: standard services agreement with moderate payment and liability risk.",
+        "categories": {
+            "payment_terms": {
+                "summary": "Payment due within 60 days of invoice.",
+                "risk_score": 6,
+                "severity": "medium",
+                "risk": "Delayed payment terms (Net-60)",
+                "recommendation": "Negotiate Net-30 payment or a late fee."
+            },
+            "liability": {
+                "summary": "Liability is not capped.",
+                "risk_score": 8,
+                "severity": "high",
+                "risk": "Unlimited liability",
+                "recommendation": "Cap liability at the contract value."
+            }
+        },
+        "recommendations": ["Cap liability to contract amount", "Shorten payment terms"],
+        "key_findings": ["Unlimited liability clause found"]
+    },
+    'summarize_contract': {
+        "summary": "Mock summary: one party provides services to the other for a fee.",
+        "explanations": [
+            {"clause": "Payment", "explanation": "The client pays within 60 days of each invoice."},
+            {"clause": "Termination", "explanation": "Either side may end the agreement with 30 days' notice."}
+        ],
+        "definitions": [
+            {"term": "Indemnify", "definition": "To cover the other party's losses."}
+        ]
+    },
+    'compare_contract_versions': {
+        "summary": "Mock comparison: payment terms and term length changed.",
+        "changes": [
+            {"clause": "Payment", "before": "Net-60", "after": "Net-30"}
+        ]
+    }
+}
+
+# Marker after which enhance_template places the template JSON; the mock echoes it back
+TEMPLATE_MARKER = 'Return only the enhanced JSON:'
+
+
+def classify_request(messages):
+    """Which GroqClient task a prompt belongs to"""
+    text = '\n'.join(message.get('content') or '' for message in messages)
+    if TEMPLATE_MARKER in text:
+        return 'enhance_template'
+    if 'risk analysis' in text:
+        return 'analyze_contract_risk'
+    if 'non-lawyers' in text:
+        return 'summarize_contract'
+    if 'versions of contracts' in text or 'contract versions' in text:
+        return 'compare_contract_versions'
+    return 'chat'
+
+
+def build_content(task, messages, canned):
+    if task == 'enhance_template':
+        text = messages[-1].get('content') or ''
+        template_text = text[text.index(TEMPLATE_MARKER) + len(TEMPLATE_MARKER):]
+        start = template_text.find('{')
+        if start >= 0:
+            try:
+                template, _ = json.JSONDecoder().raw_decode(template_text, start)
+                return json.dumps(template)
+            except ValueError:
+                pass
+    return json.dumps(canned.get(task, {"summary": "Mock response"}))
+
+
+class LatencyModel:
+    """Samples response latencies in seconds"""
+
+    def __init__(self, distribution, latency_ms, spread_ms, sigma):
+        self.distribution = distribution
+        self.latency = latency_ms / 1000.0
+        self.spread = spread_ms / 1000.0
+        self.sigma = sigma
+
+    def sample(self):
+        if self.distribution == 'uniform':
+            return max(0.0, random.uniform(self.latency - self.spread, self.latency + self.spread))
+        if self.distribution == 'lognormal':
+            # latency_ms is the median; sigma controls the tail
+            return random.lognormvariate(0, self.sigma) * self.latency
+        return self.latency
+
+
+class MockGroqHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {"error": {"message": "Not found"}})
+            return
+
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+            return
+
+        config = self.server.config
+        latency = config['latency'].sample()
+        roll = random.random()
+        if roll < config['rate_limit_rate']:
+            self.server.count('rate_limited')
+            self._send_json(429, {"error": {"message": "Rate limit reached (mock)"}},
+                            {'Retry-After': str(config['retry_after'])})
+            return
+        if roll < config['rate_limit_rate'] + config['error_rate']:
+            time.sleep(latency)
+            self.server.count('errors')
+            self._send_json(500, {"error": {"message": "Internal error (mock)"}})
+            return
+
+        messages = payload.get('messages', [])
+        task = classify_request(messages)
+        content = build_content(task, messages, config['canned'])
+        self.server.count(task)
+
+        if payload.get('stream'):
+            self._stream(payload.get('model'), content, latency)
+        else:
+            time.sleep(latency)
+            self._send_json(200, self._completion(payload.get('model'), content, messages))
+
+    def _completion(self, model, content, messages):
+        prompt_tokens = sum(len(message.get('content') or '') for message in messages) // 4
+        completion_tokens = len(content) // 4
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    def _stream(self, model, content, latency):
+        chunk_size = self.server.config['stream_chunk_chars']
+        chunks = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)] or ['']
+        delay = latency / len(chunks)
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        for chunk in chunks:
+            time.sleep(delay)
+            event = {"model": model, "choices": [{"index": 0, "delta": {"content": chunk}}]}
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.config['verbose']:
+            super().log_message(format, *args)
+
+
+class MockGroqServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config):
+        super().__init__(address, MockGroqHandler)
+        self.config = config
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def count(self, key):
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local mock of the Groq chat completions API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency-dist', choices=['constant', 'uniform', 'lognormal'], default='lognormal')
+    parser.add_argument('--latency-ms', type=float, default=800, help='Constant/mean latency, or median for lognormal')
+    parser.add_argument('--spread-ms', type=float, default=300, help='Half-width of the uniform distribution')
+    parser.add_argument('--sigma', type=float, default=0.5, help='Lognormal shape; larger means a longer tail')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of calls answered with HTTP 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction of calls answered with HTTP 429')
+    parser.add_argument('--retry-after', type=float, default=2, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--stream-chunk-chars', type=int, default=40)
+    parser.add_argument('--responses', help='JSON file of canned responses by task, merged over the defaults')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    canned = dict(CANNED_RESPONSES)
+    if args.responses:
+        with open(args.responses, 'r', encoding='utf-8') as f:
+            canned.update(json.load(f))
+
+    config = {
+        'latency': LatencyModel(args.latency_dist, args.latency_ms, args.spread_ms, args.sigma),
+        'error_rate': args.error_rate,
+        'rate_limit_rate': args.rate_limit_rate,
+        'retry_after': args.retry_after,
+        'stream_chunk_chars': args.stream_chunk_chars,
+        'canned': canned,
+        'verbose': args.verbose
+    }
+    server = MockGroqServer((args.host, args.port), config)
+    print(f"Mock Groq listening on http://{args.host}:{args.port}/openai/v1 "
+          f"({args.latency_dist} {args.latency_ms}ms, errors {args.error_rate:.0%}, 429s {args.rate_limit_rate:.0%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Requests served: {server.counts}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+# loadtest/run_load_test.py - End-to-End Load Test Driver
+"""
+Drives a running backend through its HTTP blueprints (upload, compare,
+summarize, generate) with concurrent virtual users and reports throughput,
+latency percentiles and error rates per endpoint.
+
+Typical run against the mock LLM:
+
+    python loadtest/mock_groq.py --latency-ms 600 &
+    GROQ_BASE_URL=http://127.0.0.1:8900/openai/v1 GROQ_API_KEY=mock python app.py &
+    python loadtest/run_load_test.py --concurrency 8 --duration 60
+"""
+import argparse
+import io
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+SCENARIOS = ('upload', 'compare', 'summarize', 'generate')
+
+SAMPLE_CONTRACT = """SERVICES AGREEMENT
+
+This Services Agreement is entered into between Acme Corp ("Client") and Jane Doe ("Provider").
+
+1. Services
+The Provider will deliver software development services described in Schedule A.
+
+2. Payment Terms
+The Client shall pay each invoice within sixty (60) days of receipt.
+
+3. Term and Termination
+This Agreement lasts twelve months. Either party may terminate with thirty (30) days' written notice.
+
+4. Intellectual Property
+All work product is assigned to the Client upon full payment.
+
+5. Liability
+Each party is liable for damages arising from its breach of this Agreement.
+
+6. Governing Law
+This Agreement is governed by the laws of the State of Delaware.
+"""
+
+GENERATE_INPUT = {
+    "agreement_date": "2025-01-01",
+    "disclosing_party": {"company_name": "Acme Corp", "address": "1 Main St", "email": "legal@acme.test"},
+    "receiving_party": {"name": "Jane Doe", "address": "2 High St", "email": "jane@example.test"}
+}
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    # Nearest rank, as model_router.p90 computes it
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Results:
+    """Latencies and outcomes collected per endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+
+    def record(self, endpoint, latency, ok, status):
+        with self._lock:
+            entry = self.samples.setdefault(endpoint, {'latencies': [], 'errors': 0, 'statuses': {}})
+            entry['latencies'].append(latency)
+            entry['statuses'][status] = entry['statuses'].get(status, 0) + 1
+            if not ok:
+                entry['errors'] += 1
+
+    def report(self, elapsed):
+        rows = []
+        for endpoint, entry in sorted(self.samples.items()):
+            latencies = sorted(entry['latencies'])
+            count = len(latencies)
+            rows.append({
+                'endpoint': endpoint,
+                'requests': count,
+                'throughput_rps': round(count / elapsed, 2) if elapsed else 0.0,
+                'error_rate': round(entry['errors'] / count, 4) if count else 0.0,
+                'p50_ms': round(percentile(latencies, 0.50) * 1000, 1),
+                'p90_ms': round(percentile(latencies, 0.90) * 1000, 1),
+                'p99_ms': round(percentile(latencies, 0.99) * 1000, 1),
+                'max_ms': round(latencies[-1] * 1000, 1) if latencies else 0.0,
+                'statuses': entry['statuses']
+            })
+        return rows
+
+
+class LoadTestClient:
+    """One authenticated API session shared by the virtual users"""
+
+    def __init__(self, base_url, email, password, unique_uploads, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.email = email
+        self.password = password
+        self.unique_uploads = unique_uploads
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=64, pool_maxsize=64)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.token = None
+        self.seed_contract_id = None
+
+    def _headers(self):
+        return {'Authorization': f'Bearer {self.token}'}
+
+    def login(self):
+        response = self.session.post(f'{self.base_url}/api/auth/login', json={
+            'email': self.email, 'password': self.password
+        }, timeout=self.timeout)
+        if response.status_code != 200:
+            response = self.session.post(f'{self.base_url}/api/auth/register', json={
+                'email': self.email, 'password': self.password,
+                'first_name': 'Load', 'last_name': 'Test'
+            }, timeout=self.timeout)
+        response.raise_for_status()
+        self.token = response.json()['access_token']
+
+    def _contract_file(self):
+        text = SAMPLE_CONTRACT
+        if self.unique_uploads:
+            # A nonce defeats content dedupe and cached analyses, so every upload does full work
+            text += f"\nReference: {uuid.uuid4()}\n"
+        return io.BytesIO(text.encode('utf-8'))
+
+    def upload(self):
+        return self.session.post(
+            f'{self.base_url}/api/upload/contract',
+            headers=self._headers(),
+            files={'file': ('loadtest-contract.txt', self._contract_file(), 'text/plain')},
+            data={'title': 'Load test contract'},
+            timeout=self.timeout
+        )
+
+    def seed(self):
+        """Upload the contract later compare and summarize calls refer to"""
+        response = self.upload()
+        response.raise_for_status()
+        body = response.json()
+        self.seed_contract_id = body.get('contract', {}).get('id') or body.get('contract_id')
+        if not self.seed_contract_id:
+            raise RuntimeError(f'Seed upload returned no contract id: {body}')
+
+    def compare(self):
+        return self.session.post(
+            f'{self.base_url}/api/contracts/compare',
+            headers=self._headers(),
+            files={'fileB': ('loadtest-contract-b.txt', self._contract_file(), 'text/plain')},
+            data={'contract_id_a': self.seed_contract_id},
+            timeout=self.timeout
+        )
+
+    def summarize(self):
+        return self.session.post(
+            f'{self.base_url}/api/contracts/summarize',
+            headers=self._headers(),
+            data={'contract_id': self.seed_contract_id},
+            timeout=self.timeout
+        )
+
+    def generate(self):
+        return self.session.post(
+            f'{self.base_url}/api/contracts/nda/generate',
+            headers=self._headers(),
+            json=GENERATE_INPUT,
+            timeout=self.timeout
+        )
+
+
+def run_user(client, scenarios, weights, results, stop_at, max_requests, issued, issued_lock):
+    while time.monotonic() < stop_at:
+        with issued_lock:
+            if max_requests and issued[0] >= max_requests:
+                return
+            issued[0] += 1
+        scenario = random.choices(scenarios, weights)[0]
+        started = time.monotonic()
+        try:
+            response = getattr(client, scenario)()
+            # Drain the body so the latency covers the whole response
+            _ = response.content
+            results.record(scenario, time.monotonic() - started, response.status_code < 400, response.status_code)
+        except requests.RequestException as e:
+            results.record(scenario, time.monotonic() - started, False, type(e).__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end load test for the contract API')
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+    parser.add_argument('--email', default='loadtest@example.com')
+    parser.add_argument('--password', default='LoadTest123!')
+    parser.add_argument('--concurrency', type=int, default=4, help='Virtual users issuing requests in parallel')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run')
+    parser.add_argument('--requests', type=int, default=0, help='Stop after this many requests (0 = no limit)')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help='Comma-separated scenarios, optionally weighted, e.g. upload:1,summarize:3')
+    parser.add_argument('--reuse-content', action='store_true',
+                        help='Upload identical bytes every time (exercises dedupe and cached analyses)')
+    parser.add_argument('--timeout', type=float, default=120)
+    parser.add_argument('--json', dest='json_output', help='Also write the report to this file')
+    args = parser.parse_args()
+
+    scenarios, weights = [], []
+    for item in args.scenarios.split(','):
+        name, _, weight = item.strip().partition(':')
+        if name not in SCENARIOS:
+            parser.error(f'Unknown scenario: {name}')
+        scenarios.append(name)
+        weights.append(float(weight or 1))
+
+    client = LoadTestClient(args.base_url, args.email, args.password, not args.reuse_content, args.timeout)
+    client.login()
+    if {'compare', 'summarize'} & set(scenarios):
+        client.seed()
+
+    results = Results()
+    issued, issued_lock = [0], threading.Lock()
+    started = time.monotonic()
+    stop_at = started + args.duration
+    print(f"Running {args.concurrency} virtual users for up to {args.duration}s: {', '.join(scenarios)}")
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for _ in range(args.concurrency):
+            pool.submit(run_user, client, scenarios, weights, results, stop_at, args.requests, issued, issued_lock)
+    elapsed = time.monotonic() - started
+
+    rows = results.report(elapsed)
+    print(f"\n{'endpoint':<12}{'reqs':>7}{'rps':>8}{'err%':>8}{'p50ms':>10}{'p90ms':>10}{'p99ms':>10}{'maxms':>10}")
+    for row in rows:
+        print(f"{row['endpoint']:<12}{row['requests']:>7}{row['throughput_rps']:>8}"
+              f"{row['error_rate'] * 100:>8.1f}{row['p50_ms']:>10}{row['p90_ms']:>10}"
+              f"{row['p99_ms']:>10}{row['max_ms']:>10}")
+    print(f"\nElapsed {elapsed:.1f}s")
+
+    if args.json_output:
+        with open(args.json_output, 'w', encoding='utf-8') as f:
+            json.dump({'elapsed_seconds': elapsed, 'endpoints': rows}, f, indent=2, default=str)
+
+
+if __name__ == '__main__':
+    main()
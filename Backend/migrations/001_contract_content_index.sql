@@ -0,0 +1,8 @@
+-- 001_contract_content_index.sql
+-- Word count and page/line offsets computed once at ingest so content can be
+-- served in slices. NULL word_count marks rows indexed lazily on first read.
+ALTER TABLE contracts
+    ADD COLUMN word_count INT NULL,
+    ADD COLUMN char_count INT NULL,
+    ADD COLUMN page_offsets JSON NULL,
+    ADD COLUMN line_offsets JSON NULL;
@@ -0,0 +1,8 @@
+-- 002_contract_blob_store.sql
+-- Uploads are stored once per SHA-256 digest; contracts rows reference the
+-- shared blob through file_path, which also drives blob reference counting.
+ALTER TABLE contracts
+    ADD COLUMN content_hash CHAR(64) NULL;
+
+CREATE INDEX idx_contracts_content_hash ON contracts (content_hash);
+CREATE INDEX idx_contracts_file_path ON contracts (file_path(255));
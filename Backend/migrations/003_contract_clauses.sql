@@ -0,0 +1,16 @@
+-- 003_contract_clauses.sql
+-- Clause index built at ingest. Offsets are 0-based character positions into
+-- contracts.content_text (end exclusive); content_hash is the SHA-1 of the
+-- clause text with page markers removed and whitespace collapsed.
+CREATE TABLE IF NOT EXISTS contract_clauses (
+    id VARCHAR(36) PRIMARY KEY,
+    contract_id VARCHAR(36) NOT NULL,
+    clause_number INT NOT NULL,
+    heading VARCHAR(255) NOT NULL,
+    start_offset INT NOT NULL,
+    end_offset INT NOT NULL,
+    content_hash CHAR(40) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_contract_clauses_contract (contract_id, clause_number),
+    INDEX idx_contract_clauses_hash (content_hash)
+);
@@ -0,0 +1,23 @@
+-- 004_llm_result_cache.sql
+-- Cache keys for reusing LLM results. text_hash is the SHA-256 of
+-- contracts.content_text; comparisons are looked up by the ordered pair of
+-- text hashes plus prompt version and model, analyses by a cache_key that
+-- also covers the user's preferences.
+ALTER TABLE contracts
+    ADD COLUMN text_hash CHAR(64) NULL;
+
+CREATE INDEX idx_contracts_text_hash ON contracts (text_hash);
+
+ALTER TABLE contract_comparisons
+    ADD COLUMN text_hash_a CHAR(64) NULL,
+    ADD COLUMN text_hash_b CHAR(64) NULL,
+    ADD COLUMN prompt_version VARCHAR(32) NULL,
+    ADD COLUMN model VARCHAR(100) NULL;
+
+CREATE INDEX idx_contract_comparisons_cache
+    ON contract_comparisons (text_hash_a, text_hash_b, prompt_version, model);
+
+ALTER TABLE contract_analyses
+    ADD COLUMN cache_key CHAR(64) NULL;
+
+CREATE INDEX idx_contract_analyses_cache_key ON contract_analyses (cache_key);
@@ -0,0 +1,13 @@
+-- 005_contract_summaries.sql
+-- Summaries generated by POST /api/contracts/summarize, reused while the
+-- contract text, summary prompt version and model stay the same.
+CREATE TABLE IF NOT EXISTS contract_summaries (
+    id VARCHAR(36) PRIMARY KEY,
+    contract_id VARCHAR(36) NOT NULL,
+    text_hash CHAR(64) NOT NULL,
+    prompt_version VARCHAR(32) NOT NULL,
+    model VARCHAR(100) NOT NULL,
+    summary JSON NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_contract_summaries_key (contract_id, text_hash, prompt_version, model)
+);
@@ -0,0 +1,23 @@
+-- 006_upload_batches.sql
+-- Batch uploads (POST /api/upload/batch): one row per batch and one per file,
+-- so per-file progress can be polled through GET /api/upload/batch/<id>.
+CREATE TABLE IF NOT EXISTS upload_batches (
+    id VARCHAR(36) PRIMARY KEY,
+    user_id VARCHAR(36) NOT NULL,
+    total_files INT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    completed_at TIMESTAMP NULL,
+    INDEX idx_upload_batches_user (user_id)
+);
+
+CREATE TABLE IF NOT EXISTS upload_batch_items (
+    id VARCHAR(36) PRIMARY KEY,
+    batch_id VARCHAR(36) NOT NULL,
+    filename VARCHAR(500) NOT NULL,
+    status VARCHAR(32) NOT NULL DEFAULT 'queued',
+    contract_id VARCHAR(36) NULL,
+    error TEXT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_upload_batch_items_batch (batch_id)
+);
@@ -0,0 +1,14 @@
+-- 007_template_enhancements.sql
+-- LLM-enhanced document content reused by POST /api/contracts/<type>/generate
+-- when the same document type is generated again with the same normalized
+-- input values, template, prompt version and model.
+CREATE TABLE IF NOT EXISTS template_enhancements (
+    cache_key CHAR(64) PRIMARY KEY,
+    document_type VARCHAR(64) NOT NULL,
+    prompt_version VARCHAR(32) NOT NULL,
+    model VARCHAR(100) NOT NULL,
+    enhanced_json JSON NOT NULL,
+    hit_count INT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
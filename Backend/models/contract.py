@@ -1,34 +1,76 @@
 # models/contract.py - Contract Model
 import uuid
+import json
 from datetime import datetime
 from config.database import get_db_connection
+from services.content_index import build_content_index
 
 class Contract:
-    def __init__(self, title, filename, file_path, file_size, file_type, user_id):
+    def __init__(self, title, filename, file_path, file_size, file_type, user_id, content_hash=None):
         self.id = str(uuid.uuid4())
         self.title = title
         self.filename = filename
         self.file_path = file_path
         self.file_size = file_size
         self.file_type = file_type
+        self.content_hash = content_hash
         self.content_text = None
         self.upload_status = 'uploaded'
         self.user_id = user_id
         self.created_at = datetime.now()
         self.updated_at = datetime.now()
         self.document_type_id = ''
+        self.text_hash = None
+        self.word_count = 0
+        self.char_count = 0
+        self.page_offsets = [0]
+        self.line_offsets = [0]
+
+    def index_content(self):
+        """Compute word count and page/line offsets for the current content text"""
+        index = build_content_index(self.content_text)
+        self.text_hash = index['text_hash']
+        self.word_count = index['word_count']
+        self.char_count = index['char_count']
+        self.page_offsets = index['page_offsets']
+        self.line_offsets = index['line_offsets']
+
+    def content_index(self):
+        """Stored content index as a dictionary"""
+        return {
+            'word_count': self.word_count,
+            'char_count': self.char_count,
+            'page_offsets': self.page_offsets,
+            'line_offsets': self.line_offsets
+        }
+
+    @staticmethod
+    def _from_row(result):
+        contract = Contract.__new__(Contract)
+        for key, value in result.items():
+            if key in ('page_offsets', 'line_offsets') and isinstance(value, str):
+                value = json.loads(value)
+            setattr(contract, key, value)
+        return contract
     
-    def save(self):
-        """Save contract to database"""
+    def save(self, connection=None):
+        """Save contract to database; with a connection the insert joins the caller's transaction"""
+        if connection is not None:
+            self._insert(connection.cursor())
+            return
         with get_db_connection() as connection:
-            cursor = connection.cursor()
-            cursor.execute("""
-                INSERT INTO contracts (id, title, filename, file_path, file_size, file_type, 
-                                     content_text, upload_status, user_id, document_type_id)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (self.id, self.title, self.filename, self.file_path, self.file_size,
-                  self.file_type, self.content_text, self.upload_status, self.user_id, self.document_type_id))
+            self._insert(connection.cursor())
             connection.commit()
+
+    def _insert(self, cursor):
+        cursor.execute("""
+            INSERT INTO contracts (id, title, filename, file_path, file_size, file_type, content_hash,
+                                 content_text, upload_status, user_id, document_type_id,
+                                 text_hash, word_count, char_count, page_offsets, line_offsets)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (self.id, self.title, self.filename, self.file_path, self.file_size,
+              self.file_type, self.content_hash, self.content_text, self.upload_status, self.user_id, self.document_type_id,
+              self.text_hash, self.word_count, self.char_count, json.dumps(self.page_offsets), json.dumps(self.line_offsets)))
     
     def update(self):
         """Update contract in database"""
@@ -36,9 +78,13 @@ class Contract:
             cursor = connection.cursor()
             cursor.execute("""
                 UPDATE contracts SET title = %s, content_text = %s, upload_status = %s,
+                                   text_hash = %s, word_count = %s, char_count = %s,
+                                   page_offsets = %s, line_offsets = %s,
                                    updated_at = CURRENT_TIMESTAMP
                 WHERE id = %s
-            """, (self.title, self.content_text, self.upload_status, self.id))
+            """, (self.title, self.content_text, self.upload_status,
+                  self.text_hash, self.word_count, self.char_count, json.dumps(self.page_offsets), json.dumps(self.line_offsets),
+                  self.id))
             connection.commit()
     
     @staticmethod
@@ -49,11 +95,54 @@ class Contract:
             cursor.execute("SELECT * FROM contracts WHERE id = %s", (contract_id,))
             result = cursor.fetchone()
             if result:
-                contract = Contract.__new__(Contract)
-                for key, value in result.items():
-                    setattr(contract, key, value)
-                return contract
+                return Contract._from_row(result)
+            return None
+    
+    @staticmethod
+    def find_content_meta(contract_id):
+        """Find contract metadata and content index without loading the content text"""
+        with get_db_connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute("""
+                SELECT id, title, user_id, upload_status, word_count, char_count,
+                       page_offsets, line_offsets
+                FROM contracts WHERE id = %s
+            """, (contract_id,))
+            result = cursor.fetchone()
+            if result:
+                return Contract._from_row(result)
             return None
+
+    @staticmethod
+    def read_content_slice(contract_id, start, end):
+        """Read characters [start, end) of the stored content text"""
+        if end <= start:
+            return ''
+        with get_db_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                "SELECT SUBSTRING(content_text, %s, %s) FROM contracts WHERE id = %s",
+                (start + 1, end - start, contract_id)
+            )
+            result = cursor.fetchone()
+            return (result[0] or '') if result else ''
+    
+    @staticmethod
+    def count_by_file_path(file_path):
+        """Number of contracts referencing a stored file"""
+        with get_db_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("SELECT COUNT(*) FROM contracts WHERE file_path = %s", (file_path,))
+            return cursor.fetchone()[0]
+
+    @staticmethod
+    def file_paths_with_prefix(prefix):
+        """Distinct stored file paths under a directory"""
+        with get_db_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("SELECT DISTINCT file_path FROM contracts WHERE file_path LIKE %s",
+                           (prefix.rstrip('/\\') + '%',))
+            return [row[0] for row in cursor.fetchall()]
     
     @staticmethod
     def find_by_user_id(user_id, limit=10, offset=0):
@@ -65,13 +154,7 @@ class Contract:
                 ORDER BY created_at DESC LIMIT %s OFFSET %s
             """, (user_id, limit, offset))
             results = cursor.fetchall()
-            contracts = []
-            for result in results:
-                contract = Contract.__new__(Contract)
-                for key, value in result.items():
-                    setattr(contract, key, value)
-                contracts.append(contract)
-            return contracts
+            return [Contract._from_row(result) for result in results]
     
     @staticmethod
     def get_user_stats(user_id):
@@ -107,6 +190,8 @@ class Contract:
         """Delete contract from database"""
         with get_db_connection() as connection:
             cursor = connection.cursor()
+            cursor.execute("DELETE FROM contract_clauses WHERE contract_id = %s", (self.id,))
+            cursor.execute("DELETE FROM contract_summaries WHERE contract_id = %s", (self.id,))
             cursor.execute("DELETE FROM contracts WHERE id = %s", (self.id,))
             connection.commit()
     
@@ -135,10 +220,4 @@ class Contract:
                 ORDER BY created_at DESC
             """, (user_id,))
             results = cursor.fetchall()
-            contracts = []
-            for result in results:
-                contract = Contract.__new__(Contract)
-                for key, value in result.items():
-                    setattr(contract, key, value)
-                contracts.append(contract)
-            return contracts
\ No newline at end of file
+            return [Contract._from_row(result) for result in results]
\ No newline at end of file
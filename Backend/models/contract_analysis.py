@@ -0,0 +1,54 @@
+# models/contract_analysis.py - Contract Analysis Model
+import json
+from config.database import get_db_connection
+
+class ContractAnalysis:
+    """Risk analyses stored in contract_analyses"""
+
+    @staticmethod
+    def insert(cursor, contract_id, analysis_result, cache_key=None):
+        """Insert a completed full analysis using the caller's cursor (no commit)"""
+        cursor.execute("""
+            INSERT INTO contract_analyses (
+                id, contract_id, analysis_type, risk_score, summary,
+                key_findings, recommendations, flagged_clauses,
+                analysis_status, cache_key, created_at, updated_at
+            ) VALUES (
+                UUID(), %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW()
+            )
+        """, (
+            contract_id,
+            'full',
+            analysis_result.get('overall_risk_score', 0),
+            analysis_result.get('summary', ''),
+            json.dumps(analysis_result.get('key_findings', [])),
+            json.dumps(analysis_result.get('recommendations', [])),
+            json.dumps(analysis_result.get('categories', {})),
+            'completed',
+            cache_key
+        ))
+
+    @staticmethod
+    def find_by_cache_key(user_id, cache_key):
+        """Most recent analysis of identical content and inputs by this user, in Groq result format"""
+        with get_db_connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute("""
+                SELECT a.risk_score, a.summary, a.key_findings, a.recommendations, a.flagged_clauses
+                FROM contract_analyses a
+                JOIN contracts c ON c.id = a.contract_id
+                WHERE a.cache_key = %s AND c.user_id = %s AND a.analysis_status = 'completed'
+                ORDER BY a.created_at DESC
+                LIMIT 1
+            """, (cache_key, user_id))
+            row = cursor.fetchone()
+
+        if not row:
+            return None
+        return {
+            'overall_risk_score': row['risk_score'],
+            'summary': row['summary'],
+            'key_findings': json.loads(row['key_findings']),
+            'recommendations': json.loads(row['recommendations']),
+            'categories': json.loads(row['flagged_clauses'])
+        }
@@ -0,0 +1,69 @@
+# models/contract_clause.py - Contract Clause Index Model
+import uuid
+from config.database import get_db_connection
+
+class ContractClause:
+    """Numbered clauses of a contract, stored as offsets into contracts.content_text"""
+
+    @staticmethod
+    def replace_for_contract(contract_id, clauses, connection=None):
+        """Replace the stored clause index of a contract"""
+        def write(conn):
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM contract_clauses WHERE contract_id = %s", (contract_id,))
+            if clauses:
+                cursor.executemany("""
+                    INSERT INTO contract_clauses (id, contract_id, clause_number, heading,
+                                                  start_offset, end_offset, content_hash)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """, [
+                    (str(uuid.uuid4()), contract_id, clause['number'], clause['heading'],
+                     clause['start'], clause['end'], clause['hash'])
+                    for clause in clauses
+                ])
+
+        if connection is not None:
+            write(connection)
+            return
+        with get_db_connection() as conn:
+            write(conn)
+            conn.commit()
+
+    @staticmethod
+    def _to_clause(row):
+        return {
+            'number': row['clause_number'],
+            'heading': row['heading'],
+            'start': row['start_offset'],
+            'end': row['end_offset'],
+            'hash': row['content_hash']
+        }
+
+    @staticmethod
+    def find_by_contract_id(contract_id):
+        """Clause index of a contract in clause order"""
+        with get_db_connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute("""
+                SELECT clause_number, heading, start_offset, end_offset, content_hash
+                FROM contract_clauses WHERE contract_id = %s
+                ORDER BY clause_number
+            """, (contract_id,))
+            return [ContractClause._to_clause(row) for row in cursor.fetchall()]
+
+    @staticmethod
+    def search(contract_id, query):
+        """Clauses whose heading or text contains the query, matched literally (no LIKE wildcards)"""
+        with get_db_connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute("""
+                SELECT cc.clause_number, cc.heading, cc.start_offset, cc.end_offset, cc.content_hash
+                FROM contract_clauses cc
+                JOIN contracts c ON c.id = cc.contract_id
+                WHERE cc.contract_id = %s
+                  AND (LOCATE(%s, cc.heading) > 0
+                       OR LOCATE(%s, SUBSTRING(c.content_text, cc.start_offset + 1,
+                                               cc.end_offset - cc.start_offset)) > 0)
+                ORDER BY cc.clause_number
+            """, (contract_id, query, query))
+            return [ContractClause._to_clause(row) for row in cursor.fetchall()]
@@ -0,0 +1,50 @@
+# models/contract_comparison.py - Contract Comparison Model
+import json
+import uuid
+from config.database import get_db_connection
+
+class ContractComparison:
+    """Version comparisons stored in contract_comparisons"""
+
+    @staticmethod
+    def insert(cursor, contract_id_a, contract_id_b, comparison_result,
+               text_hash_a=None, text_hash_b=None, prompt_version=None, model=None):
+        """Insert a comparison using the caller's cursor (no commit) and return its id"""
+        comparison_id = str(uuid.uuid4())
+        cursor.execute("""
+            INSERT INTO contract_comparisons (id, contract_id_a, contract_id_b, summary, changes,
+                                              text_hash_a, text_hash_b, prompt_version, model)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (
+            comparison_id,
+            contract_id_a,
+            contract_id_b,
+            comparison_result['summary'],
+            json.dumps(comparison_result['changes']),
+            text_hash_a,
+            text_hash_b,
+            prompt_version,
+            model
+        ))
+        return comparison_id
+
+    @staticmethod
+    def find_cached(user_id, text_hash_a, text_hash_b, prompt_version, model):
+        """Earlier comparison (summary, changes) of the same ordered content pair with the same prompt and model"""
+        with get_db_connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute("""
+                SELECT cc.summary, cc.changes
+                FROM contract_comparisons cc
+                JOIN contracts ca ON cc.contract_id_a = ca.id
+                WHERE cc.text_hash_a = %s AND cc.text_hash_b = %s
+                  AND cc.prompt_version = %s AND cc.model = %s
+                  AND ca.user_id = %s
+                ORDER BY cc.created_at DESC
+                LIMIT 1
+            """, (text_hash_a, text_hash_b, prompt_version, model, user_id))
+            row = cursor.fetchone()
+
+        if not row:
+            return None
+        return {'summary': row['summary'], 'changes': json.loads(row['changes'])}
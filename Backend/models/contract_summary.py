@@ -0,0 +1,30 @@
+# models/contract_summary.py - Contract Summary Model
+import json
+import uuid
+from config.database import get_db_connection
+
+class ContractSummary:
+    """Plain-language summaries stored per contract content, prompt version and model"""
+
+    @staticmethod
+    def find(contract_id, text_hash, prompt_version, model):
+        """Stored summary for this exact content, prompt and model, if any"""
+        with get_db_connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute("""
+                SELECT summary FROM contract_summaries
+                WHERE contract_id = %s AND text_hash = %s AND prompt_version = %s AND model = %s
+            """, (contract_id, text_hash, prompt_version, model))
+            row = cursor.fetchone()
+            return json.loads(row['summary']) if row else None
+
+    @staticmethod
+    def save(contract_id, text_hash, prompt_version, model, summary):
+        with get_db_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("""
+                INSERT INTO contract_summaries (id, contract_id, text_hash, prompt_version, model, summary)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE summary = VALUES(summary), created_at = CURRENT_TIMESTAMP
+            """, (str(uuid.uuid4()), contract_id, text_hash, prompt_version, model, json.dumps(summary)))
+            connection.commit()
@@ -0,0 +1,34 @@
+# models/template_enhancement.py - Template Enhancement Cache Model
+import json
+from config.database import get_db_connection
+
+class TemplateEnhancement:
+    """LLM-enhanced template content stored by cache key"""
+
+    @staticmethod
+    def find(cache_key):
+        """Stored enhancement for this key, counting the hit"""
+        with get_db_connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute("SELECT enhanced_json FROM template_enhancements WHERE cache_key = %s", (cache_key,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            cursor.execute("""
+                UPDATE template_enhancements
+                SET hit_count = hit_count + 1, last_used_at = CURRENT_TIMESTAMP
+                WHERE cache_key = %s
+            """, (cache_key,))
+            connection.commit()
+            return json.loads(row['enhanced_json'])
+
+    @staticmethod
+    def save(cache_key, document_type, prompt_version, model, enhanced_json):
+        with get_db_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("""
+                INSERT INTO template_enhancements (cache_key, document_type, prompt_version, model, enhanced_json)
+                VALUES (%s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE enhanced_json = VALUES(enhanced_json), last_used_at = CURRENT_TIMESTAMP
+            """, (cache_key, document_type, prompt_version, model, json.dumps(enhanced_json)))
+            connection.commit()
@@ -0,0 +1,93 @@
+# models/upload_batch.py - Upload Batch Model
+import uuid
+from config.database import get_db_connection
+
+# Item statuses that still have work pending
+PENDING_STATUSES = ('queued', 'processing')
+
+class UploadBatch:
+    """Batch uploads and the processing status of each file in them"""
+
+    @staticmethod
+    def create(user_id):
+        batch_id = str(uuid.uuid4())
+        with get_db_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("INSERT INTO upload_batches (id, user_id) VALUES (%s, %s)", (batch_id, user_id))
+            connection.commit()
+        return batch_id
+
+    @staticmethod
+    def add_item(batch_id, filename, status='queued', error=None):
+        item_id = str(uuid.uuid4())
+        with get_db_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("""
+                INSERT INTO upload_batch_items (id, batch_id, filename, status, error)
+                VALUES (%s, %s, %s, %s, %s)
+            """, (item_id, batch_id, filename[:500], status, error))
+            connection.commit()
+        return item_id
+
+    @staticmethod
+    def update_item(item_id, status, contract_id=None, error=None):
+        with get_db_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("""
+                UPDATE upload_batch_items
+                SET status = %s, contract_id = COALESCE(%s, contract_id), error = %s
+                WHERE id = %s
+            """, (status, contract_id, error, item_id))
+            connection.commit()
+
+    @staticmethod
+    def close_intake(batch_id, total_files):
+        """Record how many files the batch holds once the request body has been read"""
+        with get_db_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("UPDATE upload_batches SET total_files = %s WHERE id = %s", (total_files, batch_id))
+            connection.commit()
+
+    @staticmethod
+    def mark_completed_if_done(batch_id):
+        """Stamp completed_at once intake is closed and no item is pending"""
+        with get_db_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("""
+                UPDATE upload_batches b
+                SET b.completed_at = NOW()
+                WHERE b.id = %s AND b.completed_at IS NULL AND b.total_files IS NOT NULL
+                  AND NOT EXISTS (
+                      SELECT 1 FROM upload_batch_items i
+                      WHERE i.batch_id = b.id AND i.status IN (%s, %s)
+                  )
+            """, (batch_id,) + PENDING_STATUSES)
+            connection.commit()
+
+    @staticmethod
+    def find(batch_id, user_id):
+        """Batch with its items and per-status counts, or None if it is not the user's"""
+        with get_db_connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute("""
+                SELECT id, total_files, created_at, completed_at FROM upload_batches
+                WHERE id = %s AND user_id = %s
+            """, (batch_id, user_id))
+            batch = cursor.fetchone()
+            if not batch:
+                return None
+
+            cursor.execute("""
+                SELECT id, filename, status, contract_id, error, updated_at
+                FROM upload_batch_items WHERE batch_id = %s
+                ORDER BY created_at, filename
+            """, (batch_id,))
+            items = cursor.fetchall()
+
+        counts = {}
+        for item in items:
+            counts[item['status']] = counts.get(item['status'], 0) + 1
+        batch['items'] = items
+        batch['counts'] = counts
+        batch['status'] = 'completed' if batch['completed_at'] else 'processing'
+        return batch
@@ -1,16 +1,31 @@
 # routes/contract_routes.py - Contract Management Routes
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, url_for, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.contract import Contract
 from config.database import get_db_connection
 contract_bp = Blueprint('contracts', __name__)
-import json, os
-import uuid
-from services.text_extractor import extract_text_from_file
+import json, os, time
+from services.text_extractor import extract_text_from_file, extract_text_from_stream
 from utils.file_utils import allowed_file
 from services.groq_client import GroqClient
 from document_classifier.predict import predict_document_type
-from document_generator.document_generator import DocumentGenerator
+from document_generator.document_generator import DocumentGenerator, document_filename
+from document_generator.template_renderer import TEMPLATES, TEMPLATE_FILES
+from services.blob_store import BlobStore
+from services.upload_ingest import ingest_upload, open_ephemeral_upload, ephemeral_upload
+from services.contract_ingest import prepare_contract_text, store_contract_clauses, load_contract_clauses
+from models.contract_clause import ContractClause
+from models.contract_analysis import ContractAnalysis
+from models.contract_comparison import ContractComparison
+from services.content_index import text_hash
+from services.llm_dispatch import run_concurrently
+from services.summary_service import get_or_create_summary, stream_summary
+from utils.sse import sse_response
+from services.file_delivery import send_file_download
+from services.document_enhancement import enhance_document, fill_document, FAST_MODE, ENHANCED_MODE
+from services.render_cache import RenderCache, render_key
+from services.bulk_generation import generate_bulk_zip, rows_from_csv, MAX_BULK_DOCUMENTS
+from services.generated_documents import GeneratedDocumentStore, make_download_token, resolve_download_token
 
 ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'txt'}
 
@@ -112,21 +127,49 @@ def delete_contract(contract_id):
         if not contract or contract.user_id != current_user_id:
             return jsonify({'error': 'Contract not found'}), 404
         
-        # Delete file from disk
-        import os
-        if os.path.exists(contract.file_path):
+        contract.delete()
+
+        # Delete file from disk once no other contract shares the blob
+        blob_store = BlobStore.from_app()
+        if blob_store.contains(contract.file_path):
+            blob_store.release(contract.file_path)
+        elif os.path.exists(contract.file_path):
             try:
                 os.remove(contract.file_path)
             except Exception as e:
                 print(f"Failed to delete file: {e}")
         
-        contract.delete()
-        
         return jsonify({'message': 'Contract deleted successfully'}), 200
         
     except Exception as e:
         return jsonify({'error': 'Failed to delete contract', 'details': str(e)}), 500
 
+@contract_bp.route('/<contract_id>/clauses', methods=['GET'])
+@jwt_required()
+def get_contract_clauses(contract_id):
+    """List the clause index of a contract, optionally filtered by a search term"""
+    try:
+        current_user_id = get_jwt_identity()
+        contract = Contract.find_content_meta(contract_id)
+
+        if not contract or contract.user_id != current_user_id:
+            return jsonify({'error': 'Contract not found'}), 404
+
+        query = request.args.get('q', '').strip()
+        if query:
+            clauses = ContractClause.search(contract_id, query)
+        else:
+            clauses = load_contract_clauses(contract_id)
+
+        return jsonify({
+            'contract_id': contract_id,
+            'query': query or None,
+            'clauses': clauses
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': 'Failed to retrieve clauses', 'details': str(e)}), 500
+
 @contract_bp.route('/stats', methods=['GET'])
 @jwt_required()
 def get_contract_stats():
@@ -190,6 +233,51 @@ def get_contract_analysis(contract_id):
         print("[ERROR] Failed to fetch analysis:", e)
         return jsonify({'error': 'Failed to fetch analysis', 'details': str(e)}), 500
 
+@contract_bp.route('/<contract_id>/analysis/stream', methods=['POST'])
+@jwt_required()
+def stream_contract_analysis(contract_id):
+    """Run risk analysis for a stored contract, relaying clause categories as server-sent events"""
+    user_id = get_jwt_identity()
+    contract = Contract.find_by_id(contract_id)
+
+    if not contract or contract.user_id != user_id:
+        return jsonify({'error': 'Contract not found'}), 404
+    if not contract.content_text:
+        return jsonify({'error': 'Contract has no extracted text'}), 400
+
+    with get_db_connection() as db:
+        cursor = db.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT preferences FROM user_preferences 
+            WHERE user_id = %s AND document_type_id = %s
+        """, (user_id, contract.document_type_id))
+        row = cursor.fetchone()
+        preferences = json.loads(row["preferences"]) if row else {}
+
+    groq = GroqClient()
+    analysis_key = groq.analysis_cache_key(contract.text_hash or text_hash(contract.content_text), preferences)
+
+    def events():
+        cached = ContractAnalysis.find_by_cache_key(user_id, analysis_key)
+        if cached:
+            for key, value in cached.items():
+                yield 'section', (key, None, value)
+            yield 'done', cached
+            return
+
+        for event, data in groq.stream_analyze_contract_risk(contract.content_text, preferences):
+            if event == 'done' and data:
+                result_key = groq.analysis_cache_key(
+                    contract.text_hash or text_hash(contract.content_text), preferences,
+                    groq.produced_by(data, 'analyze_contract_risk')
+                )
+                with get_db_connection() as db:
+                    ContractAnalysis.insert(db.cursor(), contract_id, data, result_key)
+                    db.commit()
+            yield event, data
+
+    return sse_response(events())
+
 @contract_bp.route('/compare', methods=['POST'])
 @jwt_required()
 def compare_contracts():
@@ -217,14 +305,16 @@ def compare_contracts():
     if file_ext[1:] not in ALLOWED_EXTENSIONS:
         return jsonify({'error': 'Unsupported file type'}), 400
 
-    file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], f"{uuid.uuid4()}{file_ext}")
-    file_b.save(file_path)
-    file_size = os.path.getsize(file_path)
+    blob_store = BlobStore.from_app()
+    blob_b = ingest_upload(file_b, blob_store, current_app.config['MAX_UPLOAD_FILE_SIZE'])
+    file_path = blob_b.path
+    file_size = blob_b.size
     file_type = file_ext[1:]
 
     # --- Extract text from File B ---
     extracted_text_b = extract_text_from_file(file_path, file_type)
     if not extracted_text_b:
+        blob_store.release(file_path)
         return jsonify({'error': 'Text extraction from File B failed'}), 500
 
     # --- Predict document type of B ---
@@ -246,6 +336,7 @@ def compare_contracts():
 
             # === Validate Document Type ===
             if contract_a.get('document_type_id') != document_type_id_b:
+                blob_store.release(file_path)
                 return jsonify({
                     'error': 'Document types do not match',
                     'details': f"Contract A is {contract_a.get('document_type')} but File B is {document_type_name_b}"
@@ -259,8 +350,9 @@ def compare_contracts():
                 file_size=file_size,
                 file_type=file_type,
                 user_id=user_id,
+                content_hash=blob_b.digest
                 )
-            contract_b.content_text =extracted_text_b
+            prepare_contract_text(contract_b, extracted_text_b)
             contract_b.document_type_id=str(document_type_id_b)
             print("Object Created")
             print("Contract Inserted Into DB")
@@ -292,54 +384,66 @@ def compare_contracts():
             preferences = json.loads(row["preferences"]) if row else {}
             print("Analyzing B")
 
-            # --- Analyze B using Groq ---
+            # --- Reuse earlier results for identical content where possible ---
             groq = GroqClient()
-            analysis_result = groq.analyze_contract_risk(extracted_text_b, preferences)
+            groq.deadline = time.monotonic() + current_app.config['COMPARE_DEADLINE_SECONDS']
+            text_hash_a = contract_a.get('text_hash') or text_hash(text_a)
+            comparison_result = ContractComparison.find_cached(
+                user_id, text_hash_a, contract_b.text_hash, groq.COMPARE_PROMPT_VERSION, groq.model_for('compare_contract_versions')
+            )
+            comparison_cached = comparison_result is not None
+
+            analysis_key = groq.analysis_cache_key(contract_b.text_hash, preferences)
+            analysis_result = ContractAnalysis.find_by_cache_key(user_id, analysis_key)
+            analysis_cached = analysis_result is not None
+
+            # --- Analyze B and compare A/B concurrently under one deadline ---
+            llm_calls = {}
+            if not analysis_cached:
+                llm_calls['analysis'] = lambda: groq.analyze_contract_risk(extracted_text_b, preferences)
+            if not comparison_cached:
+                clauses_a = load_contract_clauses(contract_id_a, text_a)
+                llm_calls['comparison'] = lambda: groq.compare_contract_versions(
+                    text_a, extracted_text_b, clauses_a, contract_b.clauses
+                )
+            print("Analyzing B and comparing")
+            # Cache lookups and clause loading above already used part of the deadline
+            llm_results, timed_out = run_concurrently(llm_calls, max(0, groq.deadline - time.monotonic()))
+            if 'analysis' in llm_calls:
+                analysis_result = llm_results['analysis']
+            if not comparison_cached:
+                comparison_result = llm_results['comparison']
+
+            # COMPARISON_SCHEMA requires summary and changes, so any result here is complete
+            if not comparison_result:
+                blob_store.release(file_path)
+                if 'comparison' in timed_out:
+                    return jsonify({'error': 'Comparison timed out'}), 504
+                return jsonify({'error': 'Comparison failed'}), 502
 
-            if analysis_result:
+            # --- Save Contract B, its analysis and the comparison in one transaction ---
+            print("Saving Comparison")
+            try:
                 contract_b.upload_status = 'completed'
-                contract_b.save()
-                cursor.execute("""
-                    INSERT INTO contract_analyses (
-                        id, contract_id, analysis_type, risk_score, summary,
-                        key_findings, recommendations, flagged_clauses,
-                        analysis_status, created_at, updated_at
-                    ) VALUES (
-                        UUID(), %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW()
-                    )
-                """, (
-                    contract_b.id,
-                    'full',
-                    analysis_result.get('overall_risk_score', 0),
-                    analysis_result.get('summary', ''),
-                    json.dumps(analysis_result.get('key_findings', [])),
-                    json.dumps(analysis_result.get('recommendations', [])),
-                    json.dumps(analysis_result.get('categories', {})),
-                    'completed'
-                ))
+                contract_b.save(db)
+                store_contract_clauses(contract_b, db)
+                if analysis_result:
+                    # Fresh results are keyed on the model that produced them, which may be the fallback
+                    if not analysis_cached:
+                        analysis_key = groq.analysis_cache_key(
+                            contract_b.text_hash, preferences, groq.produced_by(analysis_result, 'analyze_contract_risk')
+                        )
+                    ContractAnalysis.insert(cursor, contract_b.id, analysis_result, analysis_key)
+                # A cache hit is recorded for (A, new B) too, reusing the stored summary and changes
+                comparison_id = ContractComparison.insert(
+                    cursor, contract_id_a, contract_b.id, comparison_result,
+                    text_hash_a, contract_b.text_hash, groq.COMPARE_PROMPT_VERSION,
+                    groq.produced_by(comparison_result, 'compare_contract_versions')
+                )
                 db.commit()
-            
-            
-
-            print("Comparison Start")
-            # --- Compare A and B ---
-            comparison_result = groq.compare_contract_versions(text_a, extracted_text_b)
-            if not comparison_result or 'summary' not in comparison_result or 'changes' not in comparison_result:
-                return jsonify({'error': 'Comparison failed'}), 502
-            print("Saving Comparison")
-            # --- Save Comparison Entry ---
-            comparison_id = str(uuid.uuid4())
-            cursor.execute("""
-                INSERT INTO contract_comparisons (id, contract_id_a, contract_id_b, summary, changes)
-                VALUES (%s, %s, %s, %s, %s)
-            """, (
-                comparison_id,
-                contract_id_a,
-                contract_b.id,
-                comparison_result['summary'],
-                json.dumps(comparison_result['changes'])
-            ))
-            db.commit()
+            except Exception:
+                db.rollback()
+                raise
             print("Commited Comparison")
 
             return jsonify({
@@ -348,13 +452,13 @@ def compare_contracts():
                 "contract_id_b": contract_b.id,
                 "summary": comparison_result['summary'],
                 "changes": comparison_result['changes'],
-                "comparison_id": comparison_id
+                "comparison_id": comparison_id,
+                "token_stats": comparison_result.get('token_stats'),
+                "cached": {"comparison": comparison_cached, "analysis": analysis_cached}
             }), 200
 
     except Exception as e:
-        if os.path.exists(file_path):
-            try: os.remove(file_path)
-            except: pass
+        blob_store.release(file_path)
         return jsonify({'error': 'Internal error', 'details': str(e)}), 500
 
 
@@ -426,22 +530,33 @@ def get_comparison_details(comparison_id):
 
 # --- Contract Summarization ---
 @contract_bp.route('/summarize', methods=['POST'])
+@ephemeral_upload
 @jwt_required()
 def summarize_contract():
     user_id = get_jwt_identity()
+    # stream=1 relays sections to the browser as server-sent events while they are generated
+    wants_stream = (request.form.get('stream') or request.args.get('stream', '')).lower() in ('1', 'true')
 
-    # Option 1: use existing contract ID
+    # Option 1: use existing contract ID; summaries are stored and served on repeat requests
     contract_id = request.form.get('contract_id')
     contract_text = None
 
     if contract_id:
         with get_db_connection() as db:
             cursor = db.cursor(dictionary=True)
-            cursor.execute("SELECT content_text FROM contracts WHERE id = %s AND user_id = %s", (contract_id, user_id))
+            cursor.execute("SELECT content_text, text_hash FROM contracts WHERE id = %s AND user_id = %s", (contract_id, user_id))
             row = cursor.fetchone()
             if not row or not row['content_text']:
                 return jsonify({'error': 'Contract not found or missing content'}), 404
-            contract_text = row['content_text']
+
+        content_hash = row['text_hash'] or text_hash(row['content_text'])
+        if wants_stream:
+            return sse_response(stream_summary(contract_id, row['content_text'], content_hash))
+
+        result, _ = get_or_create_summary(contract_id, row['content_text'], content_hash)
+        if result:
+            return jsonify(result), 200
+        return jsonify({'error': 'Failed to summarize contract'}), 500
 
     # Option 2: user uploads a new file
     elif 'file' in request.files:
@@ -449,9 +564,16 @@ def summarize_contract():
         ext = os.path.splitext(file.filename)[1].lower().lstrip(".")
         if ext not in ALLOWED_EXTENSIONS:
             return jsonify({'error': 'Unsupported file type'}), 400
-        file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], f"{uuid.uuid4()}.{ext}")
-        file.save(file_path)
-        contract_text = extract_text_from_file(file_path, ext)
+        # Ad-hoc summaries are not kept, so the upload is extracted from memory and never stored
+        stream = open_ephemeral_upload(
+            file,
+            current_app.config['MAX_UPLOAD_FILE_SIZE'],
+            current_app.config['EPHEMERAL_SPOOL_MAX_MEMORY']
+        )
+        try:
+            contract_text = extract_text_from_stream(stream, ext)
+        finally:
+            stream.close()
 
     else:
         return jsonify({'error': 'No file or contract ID provided'}), 400
@@ -461,6 +583,8 @@ def summarize_contract():
 
     # Summarize using Groq
     groq = GroqClient()
+    if wants_stream:
+        return sse_response(groq.stream_summarize_contract(contract_text))
     result = groq.summarize_contract(contract_text)
 
     if result:
@@ -468,6 +592,13 @@ def summarize_contract():
     else:
         return jsonify({'error': 'Failed to summarize contract'}), 500
 
+def generated_download_url(token):
+    """Absolute download link; the frontend runs on another origin and uses it as an href as is"""
+    base_url = current_app.config.get('PUBLIC_BASE_URL')
+    if base_url:
+        return base_url.rstrip('/') + url_for('contracts.download_generated_document', token=token)
+    return url_for('contracts.download_generated_document', token=token, _external=True)
+
 @contract_bp.route('/<document_type>/generate', methods=['POST'])
 @jwt_required()
 def generate_contract_document(document_type):
@@ -475,34 +606,31 @@ def generate_contract_document(document_type):
         user_id = get_jwt_identity()
         input_data = request.get_json()
 
-        # Supported types and paths
-        template_file_map = {
-            "nda": "document_generator/templates/nda_templates.json",
-            "sow": "document_generator/templates/sow_templates.json",
-            "service-agreement": "document_generator/templates/service_agreement_template.json",
-            "freelancer-agreement": "document_generator/templates/freelancer_agreement_template.json"
-        }
-
         print("1")
 
         document_type = document_type.lower()
-        if document_type not in template_file_map:
+        if document_type not in TEMPLATE_FILES:
             return jsonify({"error": "Unsupported document type"}), 400
 
         print("2")
-        template_path = template_file_map[document_type]
-        if not os.path.exists(template_path):
+        # Templates are read and compiled once at startup
+        template = TEMPLATES.get(document_type)
+        if template is None:
             return jsonify({"error": "Template not found"}), 404
 
         print("3")
-        # Load template JSON
-        with open(template_path, 'r', encoding='utf-8') as f:
-            template_json = json.load(f)
-        print("4")
-
-        # Enhance using Groq
-        groq = GroqClient()
-        enhanced_json = groq.enhance_template(template_json, document_type, input_data)
+
+        # mode=fast fills placeholders locally; the default enhances the text with Groq,
+        # reusing earlier enhancements of the same type and inputs
+        mode = request.args.get('mode', ENHANCED_MODE).lower()
+        if mode not in (FAST_MODE, ENHANCED_MODE):
+            return jsonify({"error": "Unsupported generation mode"}), 400
+
+        cached = False
+        if mode == FAST_MODE:
+            enhanced_json = fill_document(template, input_data)
+        else:
+            enhanced_json, cached = enhance_document(template, document_type, input_data)
         if not enhanced_json:
             return jsonify({"error": "Failed to enhance document content"}), 500
         print("5")
@@ -515,19 +643,99 @@ def generate_contract_document(document_type):
         #     json.dump(enhanced_json, f, indent=2)
 
         print("6")
-        # Generate document using document_generator
-        generator = DocumentGenerator(combined_json_data=enhanced_json)
-        result = generator.generate_document()
-
-        if not result:
-            return jsonify({"error": "Failed to generate document"}), 500
+        # Identical final content is rendered once; later generations reuse the cached .docx
+        render_cache = RenderCache.from_app()
+        content_key = render_key(enhanced_json)
+        document_bytes = render_cache.get(content_key)
+        if document_bytes is None:
+            document_bytes = DocumentGenerator(combined_json_data=enhanced_json).render_to_bytes()
+            if not document_bytes:
+                return jsonify({"error": "Failed to generate document"}), 500
+            render_cache.put(content_key, document_bytes)
+
+        # Keep the result in the generated-document cache until its link expires
+        expiry_minutes = current_app.config['GENERATED_DOC_TTL_MINUTES']
+        meta = GeneratedDocumentStore.from_app().save(
+            document_bytes, document_filename(enhanced_json.get('document_type', 'Document')),
+            user_id, expiry_minutes * 60
+        )
 
         print("7")
         return jsonify({
             "message": "Document generated successfully",
-            "download_url": result["download_url"],
-            "expires_in_minutes": result["expiry_minutes"]
+            "download_url": generated_download_url(make_download_token(meta)),
+            "expires_in_minutes": expiry_minutes,
+            "mode": mode,
+            "cached": cached
         }), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+@contract_bp.route('/<document_type>/generate/bulk', methods=['POST'])
+@jwt_required()
+def generate_contract_documents_bulk(document_type):
+    """Generate one document per input object and stream them back as a ZIP.
+
+    Inputs are a JSON list (or {"items": [...]}) or an uploaded CSV file whose
+    dotted column names map to nested fields. Defaults to fast mode.
+    """
+    try:
+        document_type = document_type.lower()
+        if document_type not in TEMPLATE_FILES:
+            return jsonify({"error": "Unsupported document type"}), 400
+        template = TEMPLATES.get(document_type)
+        if template is None:
+            return jsonify({"error": "Template not found"}), 404
+
+        mode = request.args.get('mode', FAST_MODE).lower()
+        if mode not in (FAST_MODE, ENHANCED_MODE):
+            return jsonify({"error": "Unsupported generation mode"}), 400
+
+        if 'file' in request.files:
+            items = rows_from_csv(request.files['file'].read())
+        else:
+            payload = request.get_json(silent=True)
+            items = payload.get('items') if isinstance(payload, dict) else payload
+        if not isinstance(items, list) or not items:
+            return jsonify({"error": "Provide a non-empty list of input objects or a CSV file"}), 400
+        if not all(isinstance(item, dict) for item in items):
+            return jsonify({"error": "Every input must be a JSON object"}), 400
+        if len(items) > MAX_BULK_DOCUMENTS:
+            return jsonify({"error": f"At most {MAX_BULK_DOCUMENTS} documents per request"}), 413
+
+        archive = generate_bulk_zip(template, document_type, items, RenderCache.from_app(), mode)
+        return Response(
+            stream_with_context(archive),
+            mimetype='application/zip',
+            headers={'Content-Disposition': f'attachment; filename="{document_type}_bulk.zip"'}
+        )
+
+    except UnicodeDecodeError:
+        return jsonify({"error": "CSV file must be UTF-8 encoded"}), 400
+    except Exception as e:
+        return jsonify({"error": "Bulk generation failed", "details": str(e)}), 500
+
+@contract_bp.route('/documents/<token>', methods=['GET'])
+def download_generated_document(token):
+    """Download a generated document through the signed, expiring link returned by generate"""
+    try:
+        max_age = current_app.config['GENERATED_DOC_TTL_MINUTES'] * 60
+        payload, error = resolve_download_token(token, max_age)
+        if error == 'expired':
+            return jsonify({'error': 'Download link has expired'}), 410
+        if error:
+            return jsonify({'error': 'Document not found'}), 404
+
+        store = GeneratedDocumentStore.from_app()
+        meta = store.get(payload['id'])
+        if not meta or meta['user_id'] != payload['user_id']:
+            return jsonify({'error': 'Document not found'}), 404
+        if meta['expires_at'] <= time.time():
+            store.delete(meta['id'])
+            return jsonify({'error': 'Download link has expired'}), 410
+
+        return send_file_download(meta['path'], meta['download_name'], meta['mimetype'])
+
+    except Exception as e:
+        return jsonify({'error': 'Download failed', 'details': str(e)}), 500
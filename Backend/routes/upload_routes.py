@@ -1,15 +1,16 @@
 # routes/upload_routes.py - File Upload Routes
-from flask import Blueprint, request, jsonify, current_app, send_file
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from werkzeug.utils import secure_filename
-import os, uuid, json
-import uuid
+import os
 from models.contract import Contract
-from services.text_extractor import extract_text_from_file
+from services.content_index import resolve_content_range
+from services.file_delivery import send_file_download
+from services.blob_store import BlobStore
+from services.upload_ingest import ingest_upload, batch_upload, UploadRejected
+from services.batch_upload import start_batch
+from models.upload_batch import UploadBatch
+from services.contract_ingest import ingest_contract, load_contract_clauses
 from utils.file_utils import allowed_file
-from services.groq_client import GroqClient
-from config.database import get_db_connection
-from document_classifier.predict import predict_document_type
 
 upload_bp = Blueprint('upload', __name__)
 
@@ -36,128 +37,105 @@ def upload_contract():
             }), 400
 
         title = request.form.get('title', '').strip() or os.path.splitext(file.filename)[0]
-        file_extension = os.path.splitext(file.filename)[1].lower()
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
-        file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], unique_filename)
-
-        file.save(file_path)
-        file_size = os.path.getsize(file_path)
-        file_type = file_extension[1:]
-
-        # Create DB record for contract
-        contract = Contract(
-            title=title,
-            filename=file.filename,
-            file_path=file_path,
-            file_size=file_size,
-            file_type=file_type,
-            user_id=current_user_id
-        )
-
-        try:
-            contract.upload_status = 'processing'
-            contract.update()
 
-            extracted_text = extract_text_from_file(file_path, file_type)
-            contract.content_text = extracted_text or ''
+        blob_store = BlobStore.from_app()
+        blob = ingest_upload(file, blob_store, current_app.config['MAX_UPLOAD_FILE_SIZE'])
+        file_path = blob.path
 
-            # Predict document type
-            document_type_name = str(predict_document_type(extracted_text)) if extracted_text else ''
-            contract.document_type = document_type_name
-            print(document_type_name)
-            contract.upload_status = 'completed' if extracted_text else 'failed'
-            contract.update()
-
-            if not extracted_text:
-                return jsonify({'error': 'Text extraction failed'}), 500
-
-            # === Fetch Preferences for the Document Type ===
-            with get_db_connection() as db:
-                cursor = db.cursor(dictionary=True)
-
-                # Get or insert document_type_id
-                cursor.execute("SELECT id FROM document_types WHERE name = %s", (document_type_name,))
-                doc = cursor.fetchone()
-                if not doc:
-                    cursor.execute("INSERT INTO document_types (name) VALUES (%s)", (document_type_name,))
-                    db.commit()
-                    cursor.execute("SELECT id FROM document_types WHERE name = %s", (document_type_name,))
-                    doc = cursor.fetchone()
-                document_type_id = doc["id"]
-                contract.document_type_id = document_type_id
-                contract.save()
-                print("Contract Saved")
-
-                # Get preferences for the user and doc type
-                cursor.execute("""
-                    SELECT preferences FROM user_preferences 
-                    WHERE user_id = %s AND document_type_id = %s
-                """, (current_user_id, document_type_id))
-                row = cursor.fetchone()
-                preferences = json.loads(row["preferences"]) if row else {}
-
-                # === Analyze with Groq AI ===
-                groq = GroqClient()
-                analysis_result = groq.analyze_contract_risk(extracted_text, preferences)
-
-                if not analysis_result:
-                    return jsonify({'error': 'Contract uploaded but analysis failed'}), 202
-
-                # Save analysis
-                cursor.execute("""
-                    INSERT INTO contract_analyses (
-                        id, contract_id, analysis_type, risk_score, summary,
-                        key_findings, recommendations, flagged_clauses,
-                        analysis_status, created_at, updated_at
-                    ) VALUES (
-                        UUID(), %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW()
-                    )
-                """, (
-                    contract.id,
-                    'full',
-                    analysis_result.get('overall_risk_score', 0),
-                    analysis_result.get('summary', ''),
-                    json.dumps(analysis_result.get('key_findings', [])),
-                    json.dumps(analysis_result.get('recommendations', [])),
-                    json.dumps(analysis_result.get('categories', {})),
-                    'completed'
-                ))
-                db.commit()
-
-        except Exception as e:
-            contract.upload_status = 'failed'
-            contract.update()
-            print(f"[Error] Text extraction or analysis failed: {e}")
+        outcome = ingest_contract(current_user_id, blob, file.filename, title, blob_store,
+                                  current_app.config['SUMMARY_PREGENERATE'])
+        if outcome.status == 'extraction_failed':
+            return jsonify({'error': outcome.error}), 500
+        if outcome.status == 'analysis_failed':
+            return jsonify({'error': outcome.error}), 202
 
         return jsonify({
             'message': 'Contract uploaded and analyzed',
-            'contract': contract.to_dict()
+            'contract': outcome.contract.to_dict()
         }), 201
 
+    except UploadRejected as e:
+        return jsonify({'error': e.message}), e.status_code
+
     except Exception as e:
-        if 'file_path' in locals() and os.path.exists(file_path):
-            try: os.remove(file_path)
-            except: pass
+        if 'file_path' in locals():
+            blob_store.release(file_path)
         return jsonify({'error': 'Upload failed', 'details': str(e)}), 500
 
 
+@upload_bp.route('/batch', methods=['POST'])
+@batch_upload
+@jwt_required()
+def upload_batch():
+    """Upload many contracts (multiple 'files' parts and/or ZIP archives) for background processing"""
+    try:
+        current_user_id = get_jwt_identity()
+        files = [file for file in request.files.getlist('files') if file.filename]
+        if not files:
+            return jsonify({'error': 'No files provided'}), 400
+
+        batch_id, total = start_batch(
+            current_user_id, files, BlobStore.from_app(),
+            current_app.config['MAX_UPLOAD_FILE_SIZE'], current_app.config['SUMMARY_PREGENERATE']
+        )
+        return jsonify({
+            'message': 'Batch accepted',
+            'batch': UploadBatch.find(batch_id, current_user_id),
+            'status_url': f'/api/upload/batch/{batch_id}'
+        }), 202
+
+    except Exception as e:
+        return jsonify({'error': 'Batch upload failed', 'details': str(e)}), 500
+
+@upload_bp.route('/batch/<batch_id>', methods=['GET'])
+@jwt_required()
+def get_upload_batch(batch_id):
+    """Per-file processing status of a batch upload"""
+    try:
+        batch = UploadBatch.find(batch_id, get_jwt_identity())
+        if not batch:
+            return jsonify({'error': 'Batch not found'}), 404
+        return jsonify(batch), 200
+
+    except Exception as e:
+        return jsonify({'error': 'Failed to retrieve batch', 'details': str(e)}), 500
+
 @upload_bp.route('/contract/<contract_id>/content', methods=['GET'])
 @jwt_required()
 def get_contract_content(contract_id):
-    """Get contract text content"""
+    """Get contract text content, optionally limited to a clause, page, line or character range"""
     try:
         current_user_id = get_jwt_identity()
-        contract = Contract.find_by_id(contract_id)
+        contract = Contract.find_content_meta(contract_id)
         
         if not contract or contract.user_id != current_user_id:
             return jsonify({'error': 'Contract not found'}), 404
+
+        # Contracts ingested before the content index existed are indexed once here
+        if contract.word_count is None:
+            contract = Contract.find_by_id(contract_id)
+            contract.index_content()
+            contract.update()
+
+        clauses = load_contract_clauses(contract.id) if 'clause' in request.args else None
+
+        try:
+            span = resolve_content_range(contract.content_index(), request.args, clauses)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        content = Contract.read_content_slice(contract.id, span['start'], span['end'])
         
         return jsonify({
             'contract_id': contract.id,
             'title': contract.title,
-            'content': contract.content_text,
+            'content': content,
             'status': contract.upload_status,
-            'word_count': len(contract.content_text.split()) if contract.content_text else 0
+            'word_count': contract.word_count,
+            'char_count': contract.char_count,
+            'total_pages': len(contract.page_offsets),
+            'total_lines': len(contract.line_offsets),
+            'range': span
         }), 200
         
     except Exception as e:
@@ -177,11 +155,7 @@ def download_contract(contract_id):
         if not os.path.exists(contract.file_path):
             return jsonify({'error': 'File not found on server'}), 404
         
-        return send_file(
-            contract.file_path,
-            as_attachment=True,
-            download_name=contract.filename
-        )
+        return send_file_download(contract.file_path, contract.filename)
         
     except Exception as e:
         return jsonify({'error': 'Download failed', 'details': str(e)}), 500
\ No newline at end of file
@@ -0,0 +1,26 @@
+# services/background_tasks.py - Background Task Runner
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor, Future
+
+# Work that must not hold up a response (pre-generation, backfills) runs here,
+# separate from the pool used for request-time LLM calls
+BACKGROUND_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv('BACKGROUND_WORKERS', 2)),
+    thread_name_prefix='background'
+)
+
+
+def submit_background(task, *args, **kwargs) -> Future:
+    """Run a task in the background, logging rather than losing its exceptions"""
+    name = getattr(task, '__name__', 'task')
+
+    def run():
+        try:
+            return task(*args, **kwargs)
+        except Exception as e:
+            print(f"[Background] {name} failed: {e}")
+            traceback.print_exc()
+            return None
+
+    return BACKGROUND_EXECUTOR.submit(run)
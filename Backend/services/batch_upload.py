@@ -0,0 +1,153 @@
+# services/batch_upload.py - Batch and Archive Uploads
+import os
+import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional, Tuple
+from flask import current_app
+from models.upload_batch import UploadBatch
+from services.blob_store import BlobStore, StoredBlob
+from services.contract_ingest import ingest_contract
+from services.upload_ingest import IngestingFile, UploadRejected, INGEST_EXTENSIONS, ingest_upload
+from utils.metrics import METRICS
+
+# Separate from the request-time LLM pool so a 500-file onboarding cannot starve interactive calls
+BATCH_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv('BATCH_UPLOAD_WORKERS', 4)),
+    thread_name_prefix='batch-upload'
+)
+
+# Extraction and classification use every worker; only this many Groq analyses run at once
+ANALYSIS_SLOTS = threading.BoundedSemaphore(int(os.getenv('BATCH_ANALYSIS_CONCURRENCY', 2)))
+
+MAX_BATCH_FILES = int(os.getenv('MAX_BATCH_FILES', 500))
+
+ARCHIVE_EXTENSIONS = {'zip'}
+
+CHUNK_SIZE = 64 * 1024
+
+# (filename, stored blob or None, rejection reason or None)
+BatchEntry = Tuple[str, Optional[StoredBlob], Optional[str]]
+
+
+def _spool_archive_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, extension: str,
+                          blob_store: BlobStore, max_bytes: int) -> StoredBlob:
+    spool = IngestingFile(blob_store.new_temp_path(extension), extension, max_bytes)
+    try:
+        with archive.open(info) as member:
+            while True:
+                chunk = member.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                spool.write(chunk)
+        return spool.store(blob_store)
+    finally:
+        spool.discard()
+
+
+def iter_archive_entries(archive_stream, blob_store: BlobStore, max_bytes: int = 0) -> Iterator[BatchEntry]:
+    """Store each contract in a ZIP archive, one entry at a time.
+
+    Entries are decompressed straight through IngestingFile into the blob
+    store, so only one entry is in flight and the size limit applies to the
+    decompressed bytes (an archive bomb is cut off after ``max_bytes``).
+    """
+    with zipfile.ZipFile(archive_stream) as archive:
+        for info in archive.infolist():
+            name = os.path.basename(info.filename)
+            if info.is_dir() or not name or name.startswith('.') or info.filename.startswith('__MACOSX/'):
+                continue
+
+            extension = os.path.splitext(name)[1].lower()
+            if extension.lstrip('.') not in INGEST_EXTENSIONS:
+                yield name, None, 'File type not allowed'
+                continue
+            if max_bytes and info.file_size > max_bytes:
+                yield name, None, 'File exceeds the maximum upload size'
+                continue
+
+            try:
+                blob = _spool_archive_member(archive, info, extension, blob_store, max_bytes)
+            except UploadRejected as e:
+                yield name, None, e.message
+                continue
+            except (zipfile.BadZipFile, RuntimeError, NotImplementedError) as e:
+                # Corrupt, encrypted or unsupported-compression entries
+                yield name, None, f'Could not read archive entry: {e}'
+                continue
+            yield name, blob, None
+
+
+def iter_batch_uploads(files, blob_store: BlobStore, max_bytes: int = 0) -> Iterator[BatchEntry]:
+    """Stored contracts from a list of uploaded files, expanding ZIP archives"""
+    for file in files:
+        filename = file.filename or ''
+        extension = os.path.splitext(filename)[1].lower().lstrip('.')
+        if extension in ARCHIVE_EXTENSIONS:
+            try:
+                yield from iter_archive_entries(file.stream, blob_store, max_bytes)
+            except zipfile.BadZipFile:
+                yield filename, None, 'Invalid ZIP archive'
+        elif extension in INGEST_EXTENSIONS:
+            try:
+                yield filename, ingest_upload(file, blob_store, max_bytes), None
+            except UploadRejected as e:
+                yield filename, None, e.message
+        else:
+            yield filename, None, 'File type not allowed'
+
+
+def process_batch_item(app, batch_id: str, item_id: str, user_id: str, blob: StoredBlob, filename: str,
+                       blob_store: BlobStore, pregenerate: bool):
+    """Worker body: run one stored file through ingest and record its outcome"""
+    with app.app_context():
+        _process_batch_item(batch_id, item_id, user_id, blob, filename, blob_store, pregenerate)
+
+
+def _process_batch_item(batch_id, item_id, user_id, blob, filename, blob_store, pregenerate):
+    try:
+        UploadBatch.update_item(item_id, 'processing')
+        title = os.path.splitext(filename)[0]
+        outcome = ingest_contract(user_id, blob, filename, title, blob_store, pregenerate, ANALYSIS_SLOTS)
+        # Extraction failures return before the contracts row is saved, so there is nothing to link
+        contract_id = None if outcome.status == 'extraction_failed' else outcome.contract.id
+        UploadBatch.update_item(item_id, outcome.status, contract_id, outcome.error)
+        METRICS.increment('batch_upload_items_total', status=outcome.status)
+    except Exception as e:
+        print(f"[Batch upload] {filename} failed: {e}")
+        UploadBatch.update_item(item_id, 'failed', error=str(e))
+        METRICS.increment('batch_upload_items_total', status='failed')
+    finally:
+        UploadBatch.mark_completed_if_done(batch_id)
+
+
+def start_batch(user_id: str, files, blob_store: BlobStore, max_bytes: int = 0,
+                pregenerate: bool = False) -> Tuple[str, int]:
+    """Store every file of a batch request and queue it for processing.
+
+    Files are handed to the worker pool as soon as each one is stored, so
+    processing of early archive entries overlaps with reading later ones.
+    Returns the batch id and the number of files accepted into the batch.
+    """
+    app = current_app._get_current_object()
+    batch_id = UploadBatch.create(user_id)
+    total = 0
+    for filename, blob, error in iter_batch_uploads(files, blob_store, max_bytes):
+        total += 1
+        if total > MAX_BATCH_FILES:
+            if blob is not None:
+                blob_store.release(blob.path)
+            UploadBatch.add_item(batch_id, filename, 'rejected',
+                                 f'Batch limit of {MAX_BATCH_FILES} files reached; remaining files were skipped')
+            break
+        if blob is None:
+            UploadBatch.add_item(batch_id, filename, 'rejected', error)
+            continue
+        item_id = UploadBatch.add_item(batch_id, filename)
+        BATCH_EXECUTOR.submit(process_batch_item, app, batch_id, item_id, user_id, blob, filename,
+                              blob_store, pregenerate)
+
+    UploadBatch.close_intake(batch_id, total)
+    UploadBatch.mark_completed_if_done(batch_id)
+    METRICS.increment('batch_uploads_total')
+    return batch_id, total
@@ -0,0 +1,160 @@
+# services/blob_store.py - Content-Addressed Blob Store for Uploads
+import os
+import time
+import uuid
+import hashlib
+from typing import BinaryIO, Dict, Optional
+from flask import current_app
+from models.contract import Contract
+
+CHUNK_SIZE = 64 * 1024
+
+# Blobs younger than this are never collected, which covers the window between
+# writing a blob and inserting the contracts row that references it
+DEFAULT_GC_GRACE_SECONDS = 60 * 60
+
+
+class StoredBlob:
+    """Result of writing an upload into the blob store"""
+
+    def __init__(self, path: str, digest: str, size: int, deduplicated: bool):
+        self.path = path
+        self.digest = digest
+        self.size = size
+        self.deduplicated = deduplicated
+
+
+class BlobStore:
+    """Stores uploads once per content hash under sharded directories.
+
+    A blob with SHA-256 digest ``abcdef...`` and extension ``.pdf`` lives at
+    ``<root>/ab/cd/abcdef....pdf``. Blobs are reference-counted through the
+    ``contracts.file_path`` column: a blob no row points to is an orphan and is
+    removed either on release or by the garbage-collection pass.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.tmp_dir = os.path.join(root, 'tmp')
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    @classmethod
+    def from_app(cls):
+        return cls(current_app.config['BLOB_STORE_FOLDER'])
+
+    def blob_path(self, digest: str, extension: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:4], f"{digest}{extension}")
+
+    def new_temp_path(self, extension: str = '') -> str:
+        return os.path.join(self.tmp_dir, f"{uuid.uuid4()}{extension}.part")
+
+    def contains(self, path: str) -> bool:
+        real_root = os.path.realpath(self.root)
+        return os.path.realpath(path).startswith(real_root + os.sep)
+
+    def adopt(self, temp_path: str, digest: str, size: int, extension: str) -> StoredBlob:
+        """Move a fully written temp file to its content address, deduplicating on write"""
+        path = self.blob_path(digest, extension)
+        if os.path.exists(path):
+            os.remove(temp_path)
+            # Refresh mtime so a concurrent GC pass treats the blob as recently used
+            os.utime(path)
+            return StoredBlob(path, digest, size, deduplicated=True)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(temp_path, path)
+        return StoredBlob(path, digest, size, deduplicated=False)
+
+    def put_stream(self, stream: BinaryIO, extension: str) -> StoredBlob:
+        """Copy a readable stream into the store while hashing it"""
+        temp_path = self.new_temp_path(extension)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(temp_path, 'wb') as temp_file:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    size += len(chunk)
+                    temp_file.write(chunk)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return self.adopt(temp_path, digest.hexdigest(), size, extension)
+
+    def release(self, path: Optional[str], grace_seconds: int = DEFAULT_GC_GRACE_SECONDS) -> bool:
+        """Delete a blob if no contract references it any more.
+
+        A blob written or deduplicated within the grace period is left for the
+        garbage-collection pass instead: a concurrent upload of the same content
+        may have adopted it without having saved its contracts row yet.
+        """
+        if not path or not self.contains(path) or not os.path.exists(path):
+            return False
+        try:
+            if os.path.getmtime(path) > time.time() - grace_seconds:
+                return False
+        except FileNotFoundError:
+            return False
+        if Contract.count_by_file_path(path) > 0:
+            return False
+        try:
+            os.remove(path)
+            return True
+        except OSError as e:
+            print(f"Failed to release blob {path}: {e}")
+            return False
+
+    def sweep_temp(self, max_age_seconds: int = DEFAULT_GC_GRACE_SECONDS) -> int:
+        """Remove upload spools abandoned for longer than ``max_age_seconds``; needs no database"""
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for filename in os.listdir(self.tmp_dir):
+            path = os.path.join(self.tmp_dir, filename)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+    def collect_garbage(self, grace_seconds: int = DEFAULT_GC_GRACE_SECONDS) -> Dict:
+        """Remove orphaned blobs and abandoned temp files older than the grace period"""
+        cutoff = time.time() - grace_seconds
+        referenced = {os.path.realpath(path) for path in Contract.file_paths_with_prefix(self.root)}
+        stats = {'scanned': 0, 'removed': 0, 'removed_bytes': 0, 'temp_removed': 0}
+
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            is_tmp = os.path.realpath(dirpath) == os.path.realpath(self.tmp_dir)
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if stat.st_mtime > cutoff:
+                    continue
+                if is_tmp:
+                    os.remove(path)
+                    stats['temp_removed'] += 1
+                    continue
+                stats['scanned'] += 1
+                if os.path.realpath(path) in referenced:
+                    continue
+                try:
+                    os.remove(path)
+                    stats['removed'] += 1
+                    stats['removed_bytes'] += stat.st_size
+                except OSError as e:
+                    print(f"Failed to remove orphaned blob {path}: {e}")
+
+        # Drop shard directories emptied by the pass
+        for dirpath, dirnames, filenames in os.walk(self.root, topdown=False):
+            if dirpath not in (self.root, self.tmp_dir) and not os.listdir(dirpath):
+                os.rmdir(dirpath)
+
+        return stats
@@ -0,0 +1,243 @@
+# services/bulk_generation.py - Bulk Document Generation
+import io
+import os
+import csv
+import json
+import time
+import zipfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional, Tuple
+from werkzeug.utils import secure_filename
+from document_generator.document_generator import render_document_job
+from document_generator.template_renderer import CompiledTemplate
+from services.document_enhancement import fill_document, enhance_document, FAST_MODE
+from services.groq_client import GroqClient
+from services.rate_limiter import BACKGROUND
+from services.render_cache import RenderCache, render_key
+from utils.metrics import METRICS
+
+MAX_BULK_DOCUMENTS = int(os.getenv('MAX_BULK_DOCUMENTS', 1000))
+
+# Threads fetching LLM enhancements in enhanced mode; the rate limiter paces the actual calls
+ENHANCE_THREADS = int(os.getenv('BULK_ENHANCE_THREADS', 4))
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Process pool for python-docx rendering, started on first use.
+
+    Workers are spawned rather than forked so they never inherit locks held
+    by the web server's threads.
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=int(os.getenv('BULK_GENERATION_PROCESSES', os.cpu_count() or 2)),
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _process_pool
+
+
+def reset_process_pool(pool: ProcessPoolExecutor):
+    """Drop a pool whose worker died so the next render starts a fresh one"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit_render(index: int, document: Dict):
+    """Queue a render, replacing the pool once if it is already broken; returns (future, pool)"""
+    for _ in range(2):
+        pool = get_process_pool()
+        try:
+            return pool.submit(render_document_job, index, document), pool
+        except BrokenProcessPool:
+            reset_process_pool(pool)
+    raise BrokenProcessPool('Render workers could not be started')
+
+
+def _set_path(target: Dict, dotted_key: str, value):
+    keys = dotted_key.split('.')
+    for key in keys[:-1]:
+        target = target.setdefault(key, {})
+    target[keys[-1]] = value
+
+
+def rows_from_csv(data: bytes) -> List[Dict]:
+    """Input objects from CSV; dotted headers such as ``client.company_name`` become nested keys"""
+    reader = csv.DictReader(io.StringIO(data.decode('utf-8-sig')))
+    rows = []
+    for record in reader:
+        row = {}
+        for column, value in record.items():
+            if column and value not in (None, ''):
+                _set_path(row, column.strip(), value.strip())
+        rows.append(row)
+    return rows
+
+
+class _ZipStream:
+    """Write-only buffer a ZipFile writes into while the response drains it"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _entry_name(index: int, item: Dict, document_type: str) -> str:
+    label = item.get('_filename') or f"{document_type}_{index + 1}"
+    return f"{index + 1:04d}_{secure_filename(str(label)) or document_type}.docx"
+
+
+def _document_json(template: CompiledTemplate, document_type: str, item: Dict, mode: str) -> Optional[Dict]:
+    if mode == FAST_MODE:
+        return fill_document(template, item)
+    enhanced, _ = enhance_document(template, document_type, item, GroqClient(priority=BACKGROUND))
+    return enhanced
+
+
+def _prepared_documents(template: CompiledTemplate, document_type: str, inputs: List[Dict],
+                        mode: str) -> Iterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """(index, final JSON or None, error) per input, in completion order.
+
+    Fast mode fills locally in order. Enhanced mode waits on LLM calls, so
+    they run on threads and each document is handed on as soon as it is ready.
+    """
+    if mode == FAST_MODE:
+        for index, item in enumerate(inputs):
+            yield (index,) + _safe_document_json(template, document_type, item, mode)
+        return
+
+    threads = ThreadPoolExecutor(max_workers=ENHANCE_THREADS, thread_name_prefix='bulk-enhance')
+    try:
+        futures = {
+            threads.submit(_safe_document_json, template, document_type, item, mode): index
+            for index, item in enumerate(inputs)
+        }
+        for future in as_completed(futures):
+            yield (futures[future],) + future.result()
+    finally:
+        # A client that disconnects mid-stream must not leave the remaining enhancements queued
+        threads.shutdown(wait=False, cancel_futures=True)
+
+
+def generate_bulk_zip(template: CompiledTemplate, document_type: str, items: List[Dict],
+                      render_cache: RenderCache, mode: str = FAST_MODE) -> Iterator[bytes]:
+    """Render one document per input object and stream them back as a ZIP archive.
+
+    Documents whose final JSON was rendered before come from the render cache;
+    the rest are rendered on the process pool as soon as their JSON is ready
+    and added to the archive in completion order. ``manifest.json`` at the end
+    of the archive lists every entry, each failure and the batch's throughput.
+    If a render worker dies, the documents it took down are recorded as
+    failed and the pool is replaced, so the archive is always complete.
+    """
+    started = time.perf_counter()
+    stream = _ZipStream()
+    archive = zipfile.ZipFile(stream, 'w', zipfile.ZIP_STORED)
+    names = [_entry_name(index, item, document_type) for index, item in enumerate(items)]
+    # Render from copies without the archive-only _filename key; the caller's inputs stay untouched
+    inputs = [{key: value for key, value in item.items() if key != '_filename'} for item in items]
+    entries = [None] * len(items)
+    stats = {'documents': len(items), 'succeeded': 0, 'failed': 0, 'cache_hits': 0, 'render_seconds': 0.0}
+
+    def add(index, data, error, seconds=0.0):
+        stats['render_seconds'] += seconds
+        if data is None:
+            stats['failed'] += 1
+            entries[index] = {'index': index, 'name': None, 'error': error}
+            return
+        stats['succeeded'] += 1
+        entries[index] = {'index': index, 'name': names[index], 'error': None}
+        archive.writestr(names[index], data)
+
+    pending = {}
+
+    def collect(future):
+        index, key, pool = pending.pop(future)
+        try:
+            _, data, error, seconds = future.result()
+        except BrokenProcessPool:
+            reset_process_pool(pool)
+            add(index, None, 'Render worker terminated unexpectedly')
+            return
+        except Exception as e:
+            add(index, None, f"{type(e).__name__}: {e}")
+            return
+        if data is not None:
+            render_cache.put(key, data)
+        add(index, data, error, seconds)
+
+    for index, document, error in _prepared_documents(template, document_type, inputs, mode):
+        if document is None:
+            add(index, None, error)
+        else:
+            key = render_key(document)
+            cached = render_cache.get(key)
+            if cached is not None:
+                stats['cache_hits'] += 1
+                add(index, cached, None)
+            else:
+                try:
+                    future, pool = _submit_render(index, document)
+                    pending[future] = (index, key, pool)
+                except BrokenProcessPool as e:
+                    add(index, None, str(e))
+        for future in [future for future in pending if future.done()]:
+            collect(future)
+        chunk = stream.drain()
+        if chunk:
+            yield chunk
+
+    for future in as_completed(list(pending)):
+        collect(future)
+        chunk = stream.drain()
+        if chunk:
+            yield chunk
+
+    elapsed = time.perf_counter() - started
+    stats['elapsed_seconds'] = round(elapsed, 3)
+    stats['documents_per_second'] = round(len(items) / elapsed, 2) if elapsed else None
+    stats['render_seconds'] = round(stats['render_seconds'], 3)
+    manifest = {'document_type': document_type, 'mode': mode, 'stats': stats, 'entries': entries}
+    archive.writestr('manifest.json', json.dumps(manifest, indent=2), compress_type=zipfile.ZIP_DEFLATED)
+    archive.close()
+    yield stream.drain()
+
+    METRICS.increment('bulk_generated_documents_total', stats['succeeded'], outcome='succeeded')
+    METRICS.increment('bulk_generated_documents_total', stats['failed'], outcome='failed')
+    METRICS.observe('bulk_generation_seconds', elapsed)
+    print(f"[Bulk generate] {document_type}: {stats['succeeded']}/{len(items)} documents "
+          f"({stats['cache_hits']} cached) in {elapsed:.1f}s")
+
+
+def _safe_document_json(template, document_type, item, mode):
+    try:
+        document = _document_json(template, document_type, item, mode)
+        return (document, None) if document else (None, 'Failed to enhance document content')
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
@@ -0,0 +1,100 @@
+# services/clause_segmenter.py - Clause Segmentation
+import re
+import hashlib
+from typing import Dict, List
+
+# PDF extraction inserts "--- Page N ---" lines; they are layout, not content
+PAGE_MARKER_PATTERN = re.compile(r'^--- Page \d+ ---$')
+
+# Lines that open a new clause: "1.", "2.3", "12) Term", "Section 4", "ARTICLE IV", "Clause 7:"
+HEADING_PATTERNS = [
+    re.compile(r'^(?:section|article|clause|schedule|exhibit|appendix)\s+[\dIVXLC]+[.:)]?(?:\s+\S.*)?$', re.IGNORECASE),
+    re.compile(r'^\d{1,2}(?:\.\d{1,2})*[.)]?\s+[A-Z].{0,120}$'),
+    re.compile(r'^[A-Z][A-Z0-9 ,&/\'()-]{3,80}:?$'),
+]
+
+MAX_HEADING_CHARS = 120
+
+# Documents without recognisable headings are split into blocks of about this size
+FALLBACK_BLOCK_CHARS = 1200
+
+
+def is_heading(line: str) -> bool:
+    if len(line) > MAX_HEADING_CHARS or PAGE_MARKER_PATTERN.match(line):
+        return False
+    return any(pattern.match(line) for pattern in HEADING_PATTERNS)
+
+
+def normalize_clause_text(text: str) -> str:
+    """Clause text without page markers and with collapsed whitespace"""
+    lines = [line for line in text.split('\n') if not PAGE_MARKER_PATTERN.match(line.strip())]
+    return ' '.join(' '.join(lines).split())
+
+
+def clause_hash(text: str) -> str:
+    return hashlib.sha1(normalize_clause_text(text).encode('utf-8')).hexdigest()
+
+
+def _line_spans(text: str):
+    """(start, end, stripped line) for every line, end excluding the newline"""
+    position = 0
+    for line in text.split('\n'):
+        yield position, position + len(line), line.strip()
+        position += len(line) + 1
+
+
+def _build_clause(text: str, number: int, heading: str, start: int, end: int) -> Dict:
+    return {
+        'number': number,
+        'heading': heading[:MAX_HEADING_CHARS],
+        'start': start,
+        'end': end,
+        'hash': clause_hash(text[start:end])
+    }
+
+
+def segment_clauses(text: str) -> List[Dict]:
+    """Split contract text into numbered clauses with headings, offsets and hashes.
+
+    Offsets are character positions into ``text`` (end exclusive), so a clause
+    is always ``text[start:end]``. Text before the first heading becomes a
+    "Preamble" clause.
+    """
+    if not text or not text.strip():
+        return []
+
+    spans = list(_line_spans(text))
+    boundaries = [(start, line) for start, _, line in spans if line and is_heading(line)]
+
+    if not boundaries:
+        return _segment_blocks(text, spans)
+
+    clauses = []
+    if text[:boundaries[0][0]].strip():
+        clauses.append(_build_clause(text, 1, 'Preamble', 0, boundaries[0][0]))
+
+    for index, (start, heading) in enumerate(boundaries):
+        end = boundaries[index + 1][0] if index + 1 < len(boundaries) else len(text)
+        clauses.append(_build_clause(text, len(clauses) + 1, heading, start, end))
+
+    return clauses
+
+
+def _segment_blocks(text: str, spans) -> List[Dict]:
+    """Fallback for unstructured text: line-aligned blocks of similar size"""
+    clauses = []
+    block_start = None
+    heading = ''
+    for start, end, line in spans:
+        if PAGE_MARKER_PATTERN.match(line):
+            continue
+        if block_start is None:
+            if not line:
+                continue
+            block_start, heading = start, line
+        if end - block_start >= FALLBACK_BLOCK_CHARS:
+            clauses.append(_build_clause(text, len(clauses) + 1, heading, block_start, end))
+            block_start = None
+    if block_start is not None:
+        clauses.append(_build_clause(text, len(clauses) + 1, heading, block_start, len(text)))
+    return clauses
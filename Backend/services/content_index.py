@@ -0,0 +1,133 @@
+# services/content_index.py - Content Index for Paged Retrieval
+import re
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+# PDF extraction separates pages with "--- Page N ---" marker lines
+PAGE_MARKER_PATTERN = re.compile(r'^--- Page \d+ ---$', re.MULTILINE)
+
+# Formats without real pages (DOCX, TXT) are split into virtual pages of
+# roughly this many characters, always on a line boundary
+VIRTUAL_PAGE_CHARS = 3000
+
+
+def _line_offsets(text: str) -> List[int]:
+    """Character offset at which each line starts"""
+    offsets = [0]
+    position = text.find('\n')
+    while position != -1:
+        offsets.append(position + 1)
+        position = text.find('\n', position + 1)
+    return offsets
+
+
+def _page_offsets(text: str, line_offsets: List[int]) -> List[int]:
+    """Character offset at which each page starts"""
+    markers = [match.start() for match in PAGE_MARKER_PATTERN.finditer(text)]
+    if markers:
+        return [0] + [offset for offset in markers if offset > 0]
+
+    offsets = [0]
+    for line_start in line_offsets[1:]:
+        if line_start - offsets[-1] >= VIRTUAL_PAGE_CHARS:
+            offsets.append(line_start)
+    return offsets
+
+
+def text_hash(text: Optional[str]) -> str:
+    """SHA-256 of extracted text, used to key cached LLM results"""
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+def build_content_index(text: Optional[str]) -> Dict:
+    """Compute word count, text hash and page/line offsets once at ingest"""
+    text = text or ''
+    if not text:
+        return {'word_count': 0, 'char_count': 0, 'text_hash': text_hash(text),
+                'page_offsets': [0], 'line_offsets': [0]}
+
+    line_offsets = _line_offsets(text)
+    return {
+        'text_hash': text_hash(text),
+        'word_count': len(text.split()),
+        'char_count': len(text),
+        'page_offsets': _page_offsets(text, line_offsets),
+        'line_offsets': line_offsets
+    }
+
+
+def _parse_int(args, name: str) -> Optional[int]:
+    value = args.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be an integer')
+
+
+def _offsets_span(offsets: List[int], char_count: int, first: int, last: int, unit: str) -> Tuple[int, int]:
+    """Translate a 1-based inclusive range of pages/lines into character offsets"""
+    total = len(offsets)
+    if first < 1 or first > total:
+        raise ValueError(f'{unit} out of range (1-{total})')
+    last = min(max(last, first), total)
+    start = offsets[first - 1]
+    end = offsets[last] if last < total else char_count
+    return start, end
+
+
+def resolve_content_range(index: Dict, args, clauses: Optional[List[Dict]] = None) -> Dict:
+    """Resolve clause, page, line or character query parameters into a character span.
+
+    Supported parameters (mutually exclusive, checked in this order):
+    - clause, clause_count: 1-based clause number and number of clauses (needs ``clauses``)
+    - page, page_count: 1-based page and number of pages to return
+    - line_start, line_end: 1-based inclusive line range
+    - char_start, char_end: 0-based half-open character range
+    With none of them the whole document is returned.
+    """
+    char_count = index.get('char_count') or 0
+    page_offsets = index.get('page_offsets') or [0]
+    line_offsets = index.get('line_offsets') or [0]
+
+    clause = _parse_int(args, 'clause')
+    page = _parse_int(args, 'page')
+    line_start = _parse_int(args, 'line_start')
+    char_start = _parse_int(args, 'char_start')
+
+    if clause is not None:
+        clauses = clauses or []
+        clause_count = _parse_int(args, 'clause_count') or 1
+        if clause_count < 1:
+            raise ValueError('clause_count must be positive')
+        if clause < 1 or clause > len(clauses):
+            raise ValueError(f'clause out of range (1-{len(clauses)})')
+        last_clause = min(clause + clause_count - 1, len(clauses))
+        return {
+            'unit': 'clause', 'first': clause, 'last': last_clause,
+            'start': clauses[clause - 1]['start'], 'end': clauses[last_clause - 1]['end']
+        }
+
+    if page is not None:
+        page_count = _parse_int(args, 'page_count') or 1
+        if page_count < 1:
+            raise ValueError('page_count must be positive')
+        start, end = _offsets_span(page_offsets, char_count, page, page + page_count - 1, 'page')
+        last_page = min(page + page_count - 1, len(page_offsets))
+        return {'unit': 'page', 'first': page, 'last': last_page, 'start': start, 'end': end}
+
+    if line_start is not None:
+        line_end = _parse_int(args, 'line_end') or line_start
+        start, end = _offsets_span(line_offsets, char_count, line_start, line_end, 'line')
+        last_line = min(max(line_end, line_start), len(line_offsets))
+        return {'unit': 'line', 'first': line_start, 'last': last_line, 'start': start, 'end': end}
+
+    if char_start is not None:
+        char_end = _parse_int(args, 'char_end')
+        char_end = char_count if char_end is None else min(char_end, char_count)
+        if char_start < 0 or char_start > char_end:
+            raise ValueError('Invalid character range')
+        return {'unit': 'char', 'first': char_start, 'last': char_end, 'start': char_start, 'end': char_end}
+
+    return {'unit': 'document', 'first': None, 'last': None, 'start': 0, 'end': char_count}
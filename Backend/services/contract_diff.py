@@ -0,0 +1,113 @@
+# services/contract_diff.py - Local Clause-Aligned Contract Diff
+import difflib
+from typing import Dict, List, Optional
+from services.clause_segmenter import segment_clauses, normalize_clause_text
+
+# Characters of unchanged neighbouring text shown around each change
+CONTEXT_CHARS = 300
+
+# Modified clauses longer than this are narrowed to their changed lines
+NARROW_CLAUSE_CHARS = 1500
+NARROW_CONTEXT_LINES = 2
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token for English prose)"""
+    return (len(text) + 3) // 4 if text else 0
+
+
+def _clause_text(text: str, clause: Dict) -> str:
+    return text[clause['start']:clause['end']].strip()
+
+
+def _narrow(before: str, after: str):
+    """Keep only changed lines of a long clause pair, with a little surrounding context"""
+    if len(before) <= NARROW_CLAUSE_CHARS and len(after) <= NARROW_CLAUSE_CHARS:
+        return before, after
+
+    lines_a, lines_b = before.split('\n'), after.split('\n')
+    matcher = difflib.SequenceMatcher(None, lines_a, lines_b, autojunk=False)
+    parts_a, parts_b = [], []
+    for group in matcher.get_grouped_opcodes(NARROW_CONTEXT_LINES):
+        first, last = group[0], group[-1]
+        parts_a.append('\n'.join(lines_a[first[1]:last[2]]))
+        parts_b.append('\n'.join(lines_b[first[3]:last[4]]))
+    return '\n[...]\n'.join(parts_a), '\n[...]\n'.join(parts_b)
+
+
+def _context(text: str, clauses: List[Dict], index: int, tail: bool) -> str:
+    if index < 0 or index >= len(clauses):
+        return ''
+    neighbour = _clause_text(text, clauses[index])
+    return neighbour[-CONTEXT_CHARS:] if tail else neighbour[:CONTEXT_CHARS]
+
+
+def diff_contracts(text_a: str, text_b: str,
+                   clauses_a: Optional[List[Dict]] = None,
+                   clauses_b: Optional[List[Dict]] = None) -> Dict:
+    """Compute changed clause regions between two contract versions.
+
+    Clauses are aligned on their content hashes, so unchanged clauses (even
+    when moved by a page break or whitespace change) drop out and only
+    modified, added and removed clauses are returned, each with a short
+    excerpt of its unchanged neighbours for context.
+    """
+    if normalize_clause_text(text_a or '') == normalize_clause_text(text_b or ''):
+        return {'identical': True, 'regions': []}
+
+    clauses_a = clauses_a if clauses_a is not None else segment_clauses(text_a)
+    clauses_b = clauses_b if clauses_b is not None else segment_clauses(text_b)
+
+    matcher = difflib.SequenceMatcher(
+        None,
+        [clause['hash'] for clause in clauses_a],
+        [clause['hash'] for clause in clauses_b],
+        autojunk=False
+    )
+
+    regions = []
+    for tag, a_start, a_end, b_start, b_end in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+
+        context_before = _context(text_a, clauses_a, a_start - 1, tail=True)
+        context_after = _context(text_a, clauses_a, a_end, tail=False)
+
+        # Pair clauses positionally inside a replaced block; the remainder was added or removed
+        paired = min(a_end - a_start, b_end - b_start)
+        for offset in range(max(a_end - a_start, b_end - b_start)):
+            clause_a = clauses_a[a_start + offset] if a_start + offset < a_end else None
+            clause_b = clauses_b[b_start + offset] if b_start + offset < b_end else None
+            before = _clause_text(text_a, clause_a) if clause_a else ''
+            after = _clause_text(text_b, clause_b) if clause_b else ''
+            if offset < paired:
+                kind = 'modified'
+                before, after = _narrow(before, after)
+            else:
+                kind = 'removed' if clause_a else 'added'
+
+            regions.append({
+                'kind': kind,
+                'heading': (clause_b or clause_a)['heading'],
+                'before': before,
+                'after': after,
+                'context_before': context_before,
+                'context_after': context_after
+            })
+
+    return {'identical': False, 'regions': regions}
+
+
+def format_regions_for_prompt(regions: List[Dict]) -> str:
+    """Render changed regions as the text block sent to the LLM"""
+    blocks = []
+    for number, region in enumerate(regions, start=1):
+        lines = [f"Change {number} ({region['kind']}) - {region['heading']}"]
+        if region['context_before']:
+            lines.append(f"Context before:\n{region['context_before']}")
+        lines.append(f"Version A:\n{region['before'] or '[not present]'}")
+        lines.append(f"Version B:\n{region['after'] or '[not present]'}")
+        if region['context_after']:
+            lines.append(f"Context after:\n{region['context_after']}")
+        blocks.append('\n'.join(lines))
+    return '\n\n'.join(blocks)
@@ -0,0 +1,155 @@
+# services/contract_ingest.py - Contract Ingest Stages
+import os
+import json
+from contextlib import nullcontext
+from typing import Dict, List, Optional
+from models.contract import Contract
+from models.contract_clause import ContractClause
+from models.contract_analysis import ContractAnalysis
+from services.clause_segmenter import segment_clauses
+from services.blob_store import BlobStore, StoredBlob
+from services.text_extractor import extract_text_from_file
+from services.groq_client import GroqClient
+from services.rate_limiter import BACKGROUND
+from services.background_tasks import submit_background
+from services.summary_service import pregenerate_summary
+from config.database import get_db_connection
+from document_classifier.predict import predict_document_type
+
+
+def prepare_contract_text(contract: Contract, extracted_text: Optional[str]):
+    """Attach extracted text to a contract and build its content and clause indexes.
+
+    Runs right after text extraction, before the contract row is saved; the
+    clause index is persisted with store_contract_clauses once the row exists.
+    """
+    contract.content_text = extracted_text or ''
+    contract.index_content()
+    contract.clauses = segment_clauses(contract.content_text)
+
+
+def store_contract_clauses(contract: Contract, connection=None):
+    ContractClause.replace_for_contract(contract.id, getattr(contract, 'clauses', []), connection)
+
+
+def load_contract_clauses(contract_id: str, content_text: Optional[str] = None) -> List[Dict]:
+    """Stored clause index of a contract, building it on first use for older contracts"""
+    clauses = ContractClause.find_by_contract_id(contract_id)
+    if clauses:
+        return clauses
+
+    if content_text is None:
+        contract = Contract.find_by_id(contract_id)
+        content_text = contract.content_text if contract else None
+    if not content_text:
+        return []
+
+    clauses = segment_clauses(content_text)
+    ContractClause.replace_for_contract(contract_id, clauses)
+    return clauses
+
+
+class IngestOutcome:
+    """Result of running one stored upload through extraction, classification and analysis.
+
+    ``status`` is 'completed', 'extraction_failed', 'analysis_failed' or 'failed'.
+    """
+
+    def __init__(self, contract: Contract, status: str, error: Optional[str] = None):
+        self.contract = contract
+        self.status = status
+        self.error = error
+
+
+def document_type_id_for(cursor, connection, document_type_name: str):
+    """Id of a document type, inserting the type on first sight"""
+    cursor.execute("SELECT id FROM document_types WHERE name = %s", (document_type_name,))
+    doc = cursor.fetchone()
+    if not doc:
+        cursor.execute("INSERT INTO document_types (name) VALUES (%s)", (document_type_name,))
+        connection.commit()
+        cursor.execute("SELECT id FROM document_types WHERE name = %s", (document_type_name,))
+        doc = cursor.fetchone()
+    return doc["id"]
+
+
+def ingest_contract(user_id: str, blob: StoredBlob, filename: str, title: str, blob_store: BlobStore,
+                    pregenerate: bool = False, analysis_slot=None) -> IngestOutcome:
+    """Create a contract from a stored upload: extract, index, classify and analyze it.
+
+    ``analysis_slot`` is an optional context manager (e.g. a semaphore) held
+    around the Groq analysis call, so callers fanning out many files can cap
+    how many analyses run at once without serializing extraction.
+    """
+    file_type = os.path.splitext(filename)[1].lower()[1:]
+    contract = Contract(
+        title=title,
+        filename=filename,
+        file_path=blob.path,
+        file_size=blob.size,
+        file_type=file_type,
+        user_id=user_id,
+        content_hash=blob.digest
+    )
+
+    try:
+        contract.upload_status = 'processing'
+        contract.update()
+
+        extracted_text = extract_text_from_file(blob.path, file_type)
+        prepare_contract_text(contract, extracted_text)
+
+        # Predict document type
+        document_type_name = str(predict_document_type(extracted_text)) if extracted_text else ''
+        contract.document_type = document_type_name
+        contract.upload_status = 'completed' if extracted_text else 'failed'
+        contract.update()
+
+        if not extracted_text:
+            blob_store.release(blob.path)
+            return IngestOutcome(contract, 'extraction_failed', 'Text extraction failed')
+
+        with get_db_connection() as db:
+            cursor = db.cursor(dictionary=True)
+            contract.document_type_id = document_type_id_for(cursor, db, document_type_name)
+            contract.save()
+            store_contract_clauses(contract)
+
+            if pregenerate:
+                submit_background(pregenerate_summary, contract.id, contract.content_text, contract.text_hash)
+
+            # Get preferences for the user and doc type
+            cursor.execute("""
+                SELECT preferences FROM user_preferences 
+                WHERE user_id = %s AND document_type_id = %s
+            """, (user_id, contract.document_type_id))
+            row = cursor.fetchone()
+            preferences = json.loads(row["preferences"]) if row else {}
+
+            # Analyze with Groq, reusing an earlier analysis of identical content.
+            # Upload analysis yields to interactive calls when Groq budget is short
+            groq = GroqClient(priority=BACKGROUND)
+            analysis_key = groq.analysis_cache_key(contract.text_hash, preferences)
+            analysis_result = ContractAnalysis.find_by_cache_key(user_id, analysis_key)
+            if not analysis_result:
+                with analysis_slot or nullcontext():
+                    analysis_result = groq.analyze_contract_risk(extracted_text, preferences)
+                if analysis_result:
+                    # Keyed on the model that produced it, which may be the route's fallback
+                    analysis_key = groq.analysis_cache_key(
+                        contract.text_hash, preferences, groq.produced_by(analysis_result, 'analyze_contract_risk')
+                    )
+
+            if not analysis_result:
+                return IngestOutcome(contract, 'analysis_failed', 'Contract uploaded but analysis failed')
+
+            ContractAnalysis.insert(cursor, contract.id, analysis_result, analysis_key)
+            db.commit()
+
+    except Exception as e:
+        contract.upload_status = 'failed'
+        contract.update()
+        print(f"[Error] Text extraction or analysis failed: {e}")
+        return IngestOutcome(contract, 'failed', str(e))
+
+    return IngestOutcome(contract, 'completed')
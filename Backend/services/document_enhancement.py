@@ -0,0 +1,69 @@
+# services/document_enhancement.py - Document Content Filling and Enhancement
+import json
+import hashlib
+from typing import Dict, Optional, Tuple
+from document_generator.template_renderer import CompiledTemplate
+from models.template_enhancement import TemplateEnhancement
+from services.groq_client import GroqClient
+
+# Generation modes accepted by the generate endpoint
+FAST_MODE = 'fast'
+ENHANCED_MODE = 'enhanced'
+
+
+def normalize_inputs(value):
+    """Input values for cache keys, with None members dropped.
+
+    A None value leaves its placeholder unfilled exactly like a missing key,
+    so the two share a key. Empty strings and whitespace are kept: they fill
+    placeholders differently and end up verbatim in the document.
+    """
+    if isinstance(value, dict):
+        return {key: normalize_inputs(item) for key, item in value.items() if item is not None}
+    if isinstance(value, list):
+        return [normalize_inputs(item) for item in value]
+    return value
+
+
+def enhancement_cache_key(template: CompiledTemplate, document_type: str, input_data: Dict,
+                          prompt_version: str, model: str) -> str:
+    key_source = json.dumps({
+        'document_type': document_type,
+        'template': template.digest,
+        'inputs': normalize_inputs(input_data or {}),
+        'prompt_version': prompt_version,
+        'model': model
+    }, sort_keys=True)
+    return hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+
+
+def fill_document(template: CompiledTemplate, input_data: Dict) -> Dict:
+    """Fast mode: fill placeholders locally from the input values, no LLM call"""
+    filled = template.render(input_data or {})
+    # The template's own sample input_data must not fill placeholders the caller left out
+    filled['input_data'] = input_data or {}
+    return filled
+
+
+def enhance_document(template: CompiledTemplate, document_type: str, input_data: Dict,
+                     groq: Optional[GroqClient] = None) -> Tuple[Optional[Dict], bool]:
+    """LLM-enhanced document content, reused for repeat generations with the same inputs.
+
+    The second value tells whether the content came from the enhancement cache.
+    """
+    groq = groq or GroqClient()
+    cache_key = enhancement_cache_key(
+        template, document_type, input_data, groq.ENHANCE_PROMPT_VERSION, groq.model_for('enhance_template')
+    )
+    enhanced = TemplateEnhancement.find(cache_key)
+    if enhanced is not None:
+        return enhanced, True
+
+    enhanced = groq.enhance_template(template.template_json, document_type, input_data)
+    if enhanced:
+        # A fallback model's output (GROQ_ROUTE_ENHANCE_TEMPLATE_FALLBACK_MODEL) is keyed on that model
+        model = groq.produced_by(enhanced, 'enhance_template')
+        if model != groq.model_for('enhance_template'):
+            cache_key = enhancement_cache_key(template, document_type, input_data, groq.ENHANCE_PROMPT_VERSION, model)
+        TemplateEnhancement.save(cache_key, document_type, groq.ENHANCE_PROMPT_VERSION, model, enhanced)
+    return enhanced, False
@@ -0,0 +1,147 @@
+# services/file_delivery.py - File Download Delivery
+import os
+import mimetypes
+from datetime import datetime, timezone
+from typing import Optional
+from urllib.parse import quote
+from flask import current_app, request, Response
+from werkzeug.http import http_date, is_resource_modified
+from werkzeug.wsgi import wrap_file
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _set_content_disposition(response: Response, download_name: str):
+    """Attachment header that survives non-ASCII file names"""
+    try:
+        download_name.encode('ascii')
+        response.headers.set('Content-Disposition', 'attachment', filename=download_name)
+    except UnicodeEncodeError:
+        fallback = download_name.encode('ascii', 'ignore').decode('ascii') or 'download'
+        response.headers['Content-Disposition'] = (
+            f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(download_name)}"
+        )
+
+
+def _accel_response(file_path: str, mimetype: str, accel_root: str, accel_prefix: str) -> Optional[Response]:
+    """Hand the transfer off to the front proxy when download acceleration is configured"""
+    mode = (current_app.config.get('DOWNLOAD_ACCEL') or '').lower()
+    real_path = os.path.realpath(file_path)
+
+    if mode == 'x-accel-redirect':
+        relative_path = os.path.relpath(real_path, os.path.realpath(accel_root))
+        if relative_path.startswith('..'):
+            return None
+        header = ('X-Accel-Redirect', f"{accel_prefix.rstrip('/')}/{quote(relative_path.replace(os.sep, '/'))}")
+    elif mode == 'x-sendfile':
+        header = ('X-Sendfile', real_path)
+    else:
+        return None
+
+    response = Response(status=200, mimetype=mimetype)
+    response.headers[header[0]] = header[1]
+    return response
+
+
+class _RangeFile:
+    """Read-only view of bytes [start, stop) of an open file, handed to wsgi.file_wrapper.
+
+    Servers that sendfile() from ``fileno()`` (gunicorn) start at the current
+    offset and stop after Content-Length bytes; servers that iterate the
+    wrapper read through ``read()``, which ends at the range boundary.
+    """
+
+    def __init__(self, file_handle, start: int, stop: int):
+        file_handle.seek(start)
+        self._file = file_handle
+        self._remaining = stop - start
+
+    def read(self, size: int = -1) -> bytes:
+        if self._remaining <= 0:
+            return b''
+        data = self._file.read(self._remaining if size is None or size < 0 else min(size, self._remaining))
+        self._remaining -= len(data)
+        return data
+
+    def fileno(self) -> int:
+        return self._file.fileno()
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def close(self):
+        self._file.close()
+
+
+def _file_body(file_handle, start: int, stop: int, size: int):
+    """Response body for bytes [start, stop) of an open file.
+
+    Full, open-ended and bounded ranges all go through the server's
+    wsgi.file_wrapper, which servers such as gunicorn turn into os.sendfile
+    from the current file offset, bounded by Content-Length.
+    """
+    if start == 0 and stop == size:
+        return wrap_file(request.environ, file_handle, CHUNK_SIZE)
+    return wrap_file(request.environ, _RangeFile(file_handle, start, stop), CHUNK_SIZE)
+
+
+def send_file_download(file_path: str, download_name: str, mimetype: Optional[str] = None,
+                       accel_root: Optional[str] = None, accel_prefix: Optional[str] = None) -> Response:
+    """Send a file as an attachment with ETag/Last-Modified validation and Range support"""
+    mimetype = mimetype or mimetypes.guess_type(download_name)[0] or 'application/octet-stream'
+
+    response = _accel_response(
+        file_path,
+        mimetype,
+        accel_root or current_app.config['UPLOAD_FOLDER'],
+        accel_prefix or current_app.config.get('DOWNLOAD_ACCEL_PREFIX', '')
+    )
+    if response is not None:
+        _set_content_disposition(response, download_name)
+        return response
+
+    stat = os.stat(file_path)
+    size = stat.st_size
+    etag = f"{stat.st_mtime_ns:x}-{size:x}-{stat.st_ino:x}"
+    last_modified = datetime.fromtimestamp(int(stat.st_mtime), tz=timezone.utc)
+
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    start, stop, status = 0, size, 200
+    byte_range = request.range
+    if byte_range is not None and len(byte_range.ranges) == 1:
+        # A stale If-Range validator means the client gets the whole file again
+        if_range = request.if_range
+        range_is_current = (
+            not (if_range.etag or if_range.date)
+            or if_range.etag == etag
+            or (if_range.date is not None and if_range.date >= last_modified)
+        )
+        if range_is_current:
+            requested = byte_range.range_for_length(size)
+            if requested is None:
+                response = Response(status=416)
+                response.headers['Content-Range'] = f'bytes */{size}'
+                return response
+            start, stop = requested
+            status = 206
+
+    file_handle = open(file_path, 'rb')
+    response = Response(
+        _file_body(file_handle, start, stop, size),
+        status=status,
+        mimetype=mimetype,
+        direct_passthrough=True
+    )
+    response.content_length = stop - start
+    if status == 206:
+        response.headers['Content-Range'] = f'bytes {start}-{stop - 1}/{size}'
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.headers['Last-Modified'] = http_date(last_modified)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    _set_content_disposition(response, download_name)
+    return response
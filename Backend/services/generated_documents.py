@@ -0,0 +1,129 @@
+# services/generated_documents.py - Generated Document Cache and Signed Downloads
+import os
+import json
+import time
+import uuid
+from typing import Dict, List, Optional
+from flask import current_app
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+
+DOCX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+TOKEN_SALT = 'generated-document-download'
+
+
+class GeneratedDocumentStore:
+    """Cache directory of generated documents awaiting download.
+
+    Each document is ``<root>/<id>.docx`` with a ``<id>.json`` sidecar holding
+    its owner, download name and expiry. Files are written to a temp name and
+    renamed, so a concurrent download never sees a partial document.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    @classmethod
+    def from_app(cls):
+        return cls(current_app.config['GENERATED_DOCS_FOLDER'])
+
+    def _path(self, document_id: str, extension: str) -> str:
+        return os.path.join(self.root, f"{document_id}{extension}")
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes):
+        temp_path = f"{path}.{uuid.uuid4().hex}.part"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def save(self, data: bytes, download_name: str, user_id: str, ttl_seconds: int,
+             mimetype: str = DOCX_MIMETYPE) -> Dict:
+        document_id = str(uuid.uuid4())
+        now = time.time()
+        meta = {
+            'id': document_id,
+            'user_id': user_id,
+            'download_name': download_name,
+            'mimetype': mimetype,
+            'size': len(data),
+            'created_at': now,
+            'expires_at': now + ttl_seconds
+        }
+        self._write_atomic(self._path(document_id, '.docx'), data)
+        self._write_atomic(self._path(document_id, '.json'), json.dumps(meta).encode('utf-8'))
+        return meta
+
+    def get(self, document_id: str) -> Optional[Dict]:
+        """Metadata (with ``path``) of a stored document, or None if it is gone"""
+        try:
+            uuid.UUID(document_id)
+            with open(self._path(document_id, '.json'), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (ValueError, OSError):
+            return None
+        meta['path'] = self._path(document_id, '.docx')
+        return meta if os.path.exists(meta['path']) else None
+
+    def delete(self, document_id: str):
+        for extension in ('.docx', '.json'):
+            try:
+                os.remove(self._path(document_id, extension))
+            except FileNotFoundError:
+                pass
+
+    def entries(self) -> List[Dict]:
+        """Metadata of every stored document, with ``path`` and ``bytes`` on disk"""
+        entries = []
+        for filename in os.listdir(self.root):
+            if filename.endswith('.json'):
+                meta = self.get(filename[:-len('.json')])
+                if meta:
+                    meta['bytes'] = os.path.getsize(meta['path']) + os.path.getsize(self._path(meta['id'], '.json'))
+                    entries.append(meta)
+        return entries
+
+    def sweep(self, now: Optional[float] = None, grace_seconds: int = 600) -> Dict:
+        """Remove expired documents, plus leftovers without a sidecar and abandoned temp files.
+
+        Leftovers only go once older than ``grace_seconds``, so a document whose
+        sidecar is still being written is never mistaken for one.
+        """
+        now = now or time.time()
+        stats = {'expired': 0, 'leftovers': 0}
+        for filename in os.listdir(self.root):
+            path = os.path.join(self.root, filename)
+            document_id, extension = os.path.splitext(filename)
+            try:
+                if extension == '.json':
+                    meta = self.get(document_id)
+                    if meta is None or meta['expires_at'] <= now:
+                        self.delete(document_id)
+                        stats['expired'] += 1
+                elif (extension == '.part' or not os.path.exists(self._path(document_id, '.json'))) \
+                        and os.path.getmtime(path) < now - grace_seconds:
+                    os.remove(path)
+                    stats['leftovers'] += 1
+            except FileNotFoundError:
+                continue
+        return stats
+
+
+def _serializer() -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt=TOKEN_SALT)
+
+
+def make_download_token(meta: Dict) -> str:
+    """Signed token naming a document and its owner; it stops verifying once the document expires"""
+    return _serializer().dumps({'id': meta['id'], 'user_id': meta['user_id']})
+
+
+def resolve_download_token(token: str, max_age: int):
+    """(payload, error) for a download token; error is 'expired' or 'invalid'"""
+    try:
+        return _serializer().loads(token, max_age=max_age), None
+    except SignatureExpired:
+        return None, 'expired'
+    except BadSignature:
+        return None, 'invalid'
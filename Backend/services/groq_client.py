@@ -2,83 +2,321 @@
 import os
 import requests
 import json, re
-from typing import Optional, Dict, List
+import hashlib
+import time
+from typing import Optional, Dict, Iterator, List, Tuple
+from services.model_router import ModelRouter, ROUTER
+from services.single_flight import SingleFlight
+from services.rate_limiter import RATE_LIMITER, QUEUE_WAIT_SECONDS, INTERACTIVE
+from services.contract_diff import diff_contracts, format_regions_for_prompt, estimate_tokens
+from services.structured_output import (
+    IncrementalJSONObjectParser, ObjectSchema, StructuredResult, parse_structured, template_schema,
+    RISK_ANALYSIS_SCHEMA, SUMMARY_SCHEMA, COMPARISON_SCHEMA
+)
 
 
-import json
+# Shared by every client in the process so identical concurrent prompts reach Groq once
+LLM_SINGLE_FLIGHT = SingleFlight('groq_chat')
 
-def extract_json_object(text):
-    brace_count = 0
-    start_index = None
-
-    for i, char in enumerate(text):
-        if char == '{':
-            if brace_count == 0:
-                start_index = i
-            brace_count += 1
-        elif char == '}':
-            brace_count -= 1
-            if brace_count == 0 and start_index is not None:
-                json_str = text[start_index:i+1]
-                try:
-                    return json.loads(json_str)
-                except json.JSONDecodeError:
-                    pass  # Continue searching if this one fails
-
-    raise ValueError("Valid JSON object not found in the response.")
+# Returned by _post_completion when the request never reached Groq (rate-limit queue
+# rejection or deadline); it says nothing about the model, so it is neither recorded nor retried
+NOT_SENT = object()
 
 
 class GroqClient:
     """Client for interacting with Groq API"""
+
+    # Bump when a prompt changes so cached results from the old prompt are not reused
+    COMPARE_PROMPT_VERSION = 'compare-v2'
+    ANALYSIS_PROMPT_VERSION = 'risk-v1'
+    SUMMARY_PROMPT_VERSION = 'summary-v1'
+    ENHANCE_PROMPT_VERSION = 'enhance-v1'
     
-    def __init__(self):
+    def __init__(self, router: Optional[ModelRouter] = None, priority: str = INTERACTIVE):
         self.api_key = os.getenv('GROQ_API_KEY')
         self.model = os.getenv('GROQ_MODEL', 'llama-3.1-70b-versatile')
-        self.base_url = "https://api.groq.com/openai/v1"
-    
-    def chat_completion(self, messages: List[Dict], temperature: float = 0.7, 
-                       max_tokens: int = 1000) -> Optional[str]:
-        """Send chat completion request to Groq API"""
-        if not self.api_key:
-            print("Groq API key not configured")
+        # Overridable so load tests can point at loadtest/mock_groq.py
+        self.base_url = os.getenv('GROQ_BASE_URL', "https://api.groq.com/openai/v1")
+        self.router = router or ROUTER
+        # Rate-limiter lane: INTERACTIVE for calls a user is waiting on, BACKGROUND for uploads and backfills
+        self.priority = priority
+        # Optional time.monotonic() deadline shared by every call made through this client
+        self.deadline = None
+
+    def model_for(self, task: str) -> str:
+        """Primary model of a task's route; cache lookups are keyed on it"""
+        return self.router.route(task).model
+
+    def produced_by(self, result, task: str) -> str:
+        """Model that produced a parsed result, which may be the route's fallback; cache writes are keyed on it"""
+        return getattr(result, 'model', None) or self.model_for(task)
+
+    def _parse(self, response: Optional[str], schema: ObjectSchema, model: Optional[str]) -> Optional[Dict]:
+        result = parse_structured(response, schema)
+        return StructuredResult(result, model) if result is not None else None
+
+    def _timeout(self, timeout: float) -> Optional[float]:
+        if self.deadline is None:
+            return timeout
+        remaining = min(timeout, self.deadline - time.monotonic())
+        return remaining if remaining > 0 else None
+
+    def _reserve_budget(self, messages: List[Dict], max_tokens: int) -> Optional[int]:
+        """Wait in this client's lane for rate-limit budget; returns the tokens reserved"""
+        reserved = sum(estimate_tokens(message.get('content') or '') for message in messages) + max_tokens
+        wait = self._timeout(QUEUE_WAIT_SECONDS.get(self.priority, QUEUE_WAIT_SECONDS[INTERACTIVE]))
+        if wait is None or not RATE_LIMITER.acquire(reserved, self.priority, wait):
             return None
-        
+        return reserved
+
+    def _note_rate_limited(self, response):
+        try:
+            retry_after = float(response.headers.get('Retry-After', 5))
+        except ValueError:
+            retry_after = 5.0
+        RATE_LIMITER.back_off(retry_after)
+
+    def _post_completion(self, model: str, messages: List[Dict], temperature: float,
+                         max_tokens: int, timeout: float):
+        """Content of one completion, None if Groq failed, or NOT_SENT if it was never called"""
+        reserved = self._reserve_budget(messages, max_tokens)
+        if reserved is None:
+            return NOT_SENT
+        # Time spent queueing counts against the deadline
+        timeout = self._timeout(timeout)
+        if timeout is None:
+            RATE_LIMITER.settle(reserved, 0)
+            print("Groq request skipped: deadline passed while rate limited")
+            return NOT_SENT
+
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
-        
+
         payload = {
-            "model": self.model,
+            "model": model,
             "messages": messages,
             "temperature": temperature,
             "max_tokens": max_tokens
         }
         
+        # Tokens charged for this call; anything but a successful response is refunded in full
+        used = 0
         try:
             response = requests.post(
                 f"{self.base_url}/chat/completions",
                 headers=headers,
                 json=payload,
-                timeout=30
+                timeout=timeout
             )
             
             if response.status_code == 200:
                 data = response.json()
-                return data['choices'][0]['message']['content']
+                content = data['choices'][0]['message']['content']
+                used = data.get('usage', {}).get('total_tokens', reserved)
+                return content
             else:
+                if response.status_code == 429:
+                    self._note_rate_limited(response)
                 print(f"Groq API error: {response.status_code} - {response.text}")
                 return None
                 
         except Exception as e:
             print(f"Groq API request failed: {e}")
             return None
+        finally:
+            RATE_LIMITER.settle(reserved, used)
+
+    def request_fingerprint(self, messages: List[Dict], temperature: float,
+                            max_tokens: Optional[int], task: Optional[str]) -> str:
+        """Identity of a chat completion request, used to coalesce identical concurrent calls.
+
+        The rate-limiter lane is part of it, so an interactive call never ends up
+        waiting on a background call that is still queued behind other work.
+        """
+        source = json.dumps({
+            'route': task or self.model,
+            'priority': self.priority,
+            'messages': messages,
+            'temperature': temperature,
+            'max_tokens': max_tokens
+        }, sort_keys=True)
+        return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+    def chat_completion(self, messages: List[Dict], temperature: float = 0.7, 
+                       max_tokens: Optional[int] = None, task: Optional[str] = None) -> Optional[str]:
+        """Send chat completion request to Groq API"""
+        return self.chat_completion_with_model(messages, temperature, max_tokens, task)[0]
+
+    def chat_completion_with_model(self, messages: List[Dict], temperature: float = 0.7,
+                                   max_tokens: Optional[int] = None,
+                                   task: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+        """Send chat completion request to Groq API, returning (content, model that produced it).
+
+        With a ``task``, the model, token limit and timeout come from the model
+        router, and a failed call on the primary model is retried once on the
+        route's fallback model. Identical requests already in flight (a double
+        click, two tabs on one contract) wait for that call and share its result.
+        """
+        if not self.api_key:
+            print("Groq API key not configured")
+            return None, None
+
+        wait_timeout = None
+        if self.deadline is not None:
+            wait_timeout = max(self.deadline - time.monotonic(), 0)
+        completion, shared = LLM_SINGLE_FLIGHT.do(
+            self.request_fingerprint(messages, temperature, max_tokens, task),
+            lambda: self._routed_completion(messages, temperature, max_tokens, task),
+            wait_timeout
+        )
+        if shared:
+            print(f"[Groq] {task or 'chat'} request coalesced with an identical call in flight")
+        return completion or (None, None)
+
+    def _routed_completion(self, messages: List[Dict], temperature: float,
+                           max_tokens: Optional[int], task: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        if task is None:
+            timeout = self._timeout(30)
+            if timeout is None:
+                print("Groq request skipped: deadline already passed")
+                return None, None
+            content = self._post_completion(self.model, messages, temperature, max_tokens or 1000, timeout)
+            return (None, None) if content is NOT_SENT else (content, self.model)
+
+        route = self.router.route(task)
+        model = self.router.select_model(task)
+        while True:
+            timeout = self._timeout(route.timeout)
+            if timeout is None:
+                print("Groq request skipped: deadline already passed")
+                return None, None
+
+            started = time.monotonic()
+            content = self._post_completion(model, messages, temperature, max_tokens or route.max_tokens, timeout)
+            if content is NOT_SENT:
+                return None, None
+            self.router.record(task, model, time.monotonic() - started, content is not None)
+
+            if content is not None or model != route.model or route.fallback_model is None:
+                return content, model
+            print(f"[Model router] {task}: {model} failed, retrying on {route.fallback_model}")
+            model = route.fallback_model
+
+    def stream_chat_completion(self, messages: List[Dict], temperature: float = 0.7,
+                               max_tokens: Optional[int] = None, task: Optional[str] = None,
+                               model: Optional[str] = None) -> Iterator[str]:
+        """Stream a chat completion, yielding content deltas from the server-sent events"""
+        if not self.api_key:
+            print("Groq API key not configured")
+            return
+
+        route = self.router.route(task) if task else None
+        model = model or (self.router.select_model(task) if task else self.model)
+        max_tokens = max_tokens or (route.max_tokens if route else 1000)
+        reserved = self._reserve_budget(messages, max_tokens)
+        if reserved is None:
+            return
+        timeout = self._timeout(route.timeout if route else 30)
+        if timeout is None:
+            RATE_LIMITER.settle(reserved, 0)
+            print("Groq request skipped: deadline already passed")
+            return
+
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream"
+        }
+
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True
+        }
 
+        started = time.monotonic()
+        ok = False
+        # Groq reports usage in the last chunk (x_groq.usage, or usage with OpenAI-style stream options)
+        usage = None
+        try:
+            with requests.post(
+                f"{self.base_url}/chat/completions",
+                headers=headers,
+                json=payload,
+                timeout=timeout,
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    if response.status_code == 429:
+                        self._note_rate_limited(response)
+                    print(f"Groq API error: {response.status_code} - {response.text}")
+                    return
+
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith('data:'):
+                        continue
+                    data = line[5:].strip()
+                    if data == '[DONE]':
+                        ok = True
+                        break
+                    chunk = json.loads(data)
+                    usage = chunk.get('usage') or chunk.get('x_groq', {}).get('usage') or usage
+                    choices = chunk.get('choices') or [{}]
+                    delta = choices[0].get('delta', {}).get('content')
+                    if delta:
+                        yield delta
 
+        except Exception as e:
+            print(f"Groq API streaming request failed: {e}")
+        finally:
+            if usage:
+                used = usage.get('total_tokens', reserved)
+            else:
+                used = reserved if ok else 0
+            RATE_LIMITER.settle(reserved, used)
+            if task:
+                self.router.record(task, model, time.monotonic() - started, ok)
+
+    def _stream_structured(self, task: str, messages: List[Dict], expand_keys,
+                           schema: ObjectSchema) -> Iterator[Tuple[str, object]]:
+        """Yield ('section', (key, item, value)) as JSON members complete, then ('done', result)"""
+        parser = IncrementalJSONObjectParser(expand_keys)
+        model = self.router.select_model(task)
+        for delta in self.stream_chat_completion(messages, temperature=0.3, task=task, model=model):
+            for section in parser.feed(delta):
+                yield 'section', section
+
+        yield 'done', self._parse(parser.buffer, schema, model)
+
+
+
+    def compare_contract_versions(self, text_a, text_b, clauses_a=None, clauses_b=None):
+        """Compare two contract versions, sending only locally detected changes to the LLM"""
+        diff = diff_contracts(text_a, text_b, clauses_a, clauses_b)
+        full_prompt_tokens = estimate_tokens(text_a) + estimate_tokens(text_b)
+
+        if diff['identical'] or not diff['regions']:
+            return {
+                "summary": "No differences were found between the two versions.",
+                "changes": [],
+                "token_stats": {
+                    "llm_called": False,
+                    "changed_regions": 0,
+                    "full_prompt_tokens": full_prompt_tokens,
+                    "sent_prompt_tokens": 0,
+                    "saved_tokens": full_prompt_tokens
+                }
+            }
 
-    def compare_contract_versions(self, text_a, text_b):
+        changed_regions = format_regions_for_prompt(diff['regions'])
         prompt = f"""
-        You are a legal assistant. Compare the following two contract versions and return a JSON with:
+        You are a legal assistant. The changed clauses between two contract versions were found
+        with a local diff and are listed below, each with a little unchanged context. Clauses not
+        listed are identical in both versions. Return a JSON with:
         - summary: a high-level description of the main changes
         - changes: a list of key modifications in the format:
 
@@ -88,43 +326,56 @@ class GroqClient:
             "after": "Text from new version"
         }}
 
-        Version A:
-        {text_a}
-
-        Version B:
-        {text_b}
+        Changed regions:
+        {changed_regions}
         """
         messages = [
             {"role": "system", "content": "You are a legal AI specialized in analyzing differences between two versions of contracts."},
             {"role": "user", "content": prompt}
         ]
 
-        response = self.chat_completion(messages, temperature=0.3, max_tokens=1500)
+        sent_prompt_tokens = estimate_tokens(changed_regions)
+        token_stats = {
+            "llm_called": True,
+            "changed_regions": len(diff['regions']),
+            "full_prompt_tokens": full_prompt_tokens,
+            "sent_prompt_tokens": sent_prompt_tokens,
+            "saved_tokens": max(full_prompt_tokens - sent_prompt_tokens, 0)
+        }
+        print(f"[Compare] {token_stats['changed_regions']} changed regions, "
+              f"{token_stats['saved_tokens']} of {full_prompt_tokens} prompt tokens saved")
+
+        response, model = self.chat_completion_with_model(messages, temperature=0.3, task='compare_contract_versions')
 
-        if response:
-            try:
-                return extract_json_object(response)
-            except Exception as e:
-                print(f"[Error extracting JSON] {e}")
-                return None
-        else:
+        if not response:
             print("No response from Groq for comparison.")
             return None
 
+        result = self._parse(response, COMPARISON_SCHEMA, model)
+        if result is not None:
+            result['token_stats'] = token_stats
+        return result
 
 
-    def analyze_contract_risk(self, contract_text: str, preferences: dict) -> Optional[Dict]:
-        """Analyze contract for potential risks using Groq API and return structured clause analysis"""
-        if not contract_text or not contract_text.strip():
-            return None
 
+    def analysis_cache_key(self, text_hash: str, preferences: dict, model: Optional[str] = None) -> str:
+        """Key identifying a risk analysis of given content, preferences, prompt and model (default: the primary)"""
+        key_source = json.dumps({
+            'text_hash': text_hash,
+            'preferences': preferences or {},
+            'prompt_version': self.ANALYSIS_PROMPT_VERSION,
+            'model': model or self.model_for('analyze_contract_risk')
+        }, sort_keys=True)
+        return hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+
+    def _risk_messages(self, contract_text: str) -> List[Dict]:
         # Truncate if too long
         max_chars = 8000
         if len(contract_text) > max_chars:
             mid_point = max_chars // 2
             contract_text = contract_text[:mid_point] + "\n\n[... content truncated ...]\n\n" + contract_text[-mid_point:]
 
-        messages = [
+        return [
             {
                 "role": "system",
                 "content": """You are a legal AI assistant that performs deep contract risk analysis.
@@ -176,26 +427,29 @@ class GroqClient:
             }
         ]
 
-        response = self.chat_completion(messages, temperature=0.3, max_tokens=2000)
+    def analyze_contract_risk(self, contract_text: str, preferences: dict) -> Optional[Dict]:
+        """Analyze contract for potential risks using Groq API and return structured clause analysis"""
+        if not contract_text or not contract_text.strip():
+            return None
 
-        if response:
-            try:
-                json_start = response.find('{')
-                json_end = response.rfind('}') + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = response[json_start:json_end]
-                    return json.loads(json_str)
-            except json.JSONDecodeError:
-                print("Failed to parse Groq response as JSON")
+        messages = self._risk_messages(contract_text)
 
-        return None
+        response, model = self.chat_completion_with_model(messages, temperature=0.3, task='analyze_contract_risk')
 
-    def summarize_contract(self, text: str) -> Optional[dict]:
-        """Simplify and summarize legal contract using Groq API"""
-        if not text or not text.strip():
-            return None
+        return self._parse(response, RISK_ANALYSIS_SCHEMA, model)
 
-        messages = [
+    def stream_analyze_contract_risk(self, contract_text: str, preferences: dict) -> Iterator[Tuple[str, object]]:
+        """Streaming variant of analyze_contract_risk that yields each clause category as it completes"""
+        if not contract_text or not contract_text.strip():
+            yield 'done', None
+            return
+        yield from self._stream_structured(
+            'analyze_contract_risk', self._risk_messages(contract_text), {'categories', 'recommendations', 'key_findings'},
+            RISK_ANALYSIS_SCHEMA
+        )
+
+    def _summary_messages(self, text: str) -> List[Dict]:
+        return [
             {
                 "role": "system",
                 "content": """You are a legal AI assistant. Your job is to help non-lawyers understand legal documents.
@@ -228,14 +482,25 @@ class GroqClient:
             }
         ]
 
-        response = self.chat_completion(messages, temperature=0.3, max_tokens=2000)
+    def summarize_contract(self, text: str) -> Optional[dict]:
+        """Simplify and summarize legal contract using Groq API"""
+        if not text or not text.strip():
+            return None
+
+        messages = self._summary_messages(text)
 
-        if response:
-            try:
-                return extract_json_object(response)
-            except Exception as e:
-                print("Failed to parse Groq summary:", e)
-        return None
+        response, model = self.chat_completion_with_model(messages, temperature=0.3, task='summarize_contract')
+
+        return self._parse(response, SUMMARY_SCHEMA, model)
+
+    def stream_summarize_contract(self, text: str) -> Iterator[Tuple[str, object]]:
+        """Streaming variant of summarize_contract that yields each explanation and definition as it completes"""
+        if not text or not text.strip():
+            yield 'done', None
+            return
+        yield from self._stream_structured(
+            'summarize_contract', self._summary_messages(text), {'explanations', 'definitions'}, SUMMARY_SCHEMA
+        )
 
 
     def enhance_template(self, template_json, document_type, input_json):
@@ -261,14 +526,11 @@ class GroqClient:
     {json.dumps(template_json, indent=2)}
     """
 
-        response = self.chat_completion([
+        response, model = self.chat_completion_with_model([
             {"role": "user", "content": prompt}
-        ], temperature=0.3, max_tokens=4000)
+        ], temperature=0.3, task='enhance_template')
 
-        if response:
-            try:
-                return json.loads(response[response.find('{'):response.rfind('}')+1])
-            except json.JSONDecodeError:
-                print("⚠️ Could not parse enhanced JSON")
-                return None
-        return None
+        enhanced = self._parse(response, template_schema(template_json), model)
+        if enhanced is None:
+            print("⚠️ Could not parse enhanced JSON")
+        return enhanced
@@ -0,0 +1,34 @@
+# services/llm_dispatch.py - Concurrent LLM Call Dispatch
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Set, Tuple
+
+# Shared by all requests so concurrent endpoints cannot spawn unbounded threads
+LLM_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv('LLM_DISPATCH_WORKERS', 8)),
+    thread_name_prefix='llm-dispatch'
+)
+
+
+def run_concurrently(calls: Dict[str, Callable[[], Any]], timeout: float) -> Tuple[Dict[str, Any], Set[str]]:
+    """Run independent calls in parallel and gather their results by name.
+
+    Returns the results and the names of calls that missed the deadline.
+    A call that raised or missed the deadline yields None.
+    """
+    futures = {name: LLM_EXECUTOR.submit(call) for name, call in calls.items()}
+    done, _ = wait(futures.values(), timeout=timeout)
+
+    results, timed_out = {}, set()
+    for name, future in futures.items():
+        if future not in done:
+            future.cancel()
+            timed_out.add(name)
+            results[name] = None
+            print(f"[Dispatch] {name} missed the {timeout:.1f}s deadline")
+        elif future.exception() is not None:
+            results[name] = None
+            print(f"[Dispatch] {name} failed: {future.exception()}")
+        else:
+            results[name] = future.result()
+    return results, timed_out
@@ -0,0 +1,147 @@
+# services/model_router.py - Per-Task Model Routing
+import os
+import math
+import time
+import threading
+from collections import deque
+from typing import Dict, Optional
+from utils.metrics import METRICS
+
+DEFAULT_MODEL = 'llama-3.1-70b-versatile'
+DEFAULT_FAST_MODEL = 'llama-3.1-8b-instant'
+
+# Recent primary-model latencies kept per route; the 90th percentile is checked against the SLO
+LATENCY_WINDOW = 20
+MIN_SLO_SAMPLES = 5
+
+# How long a route stays on its fallback model after breaching its SLO before the primary is retried
+DEGRADED_SECONDS = 120
+
+
+def p90(samples) -> float:
+    """Nearest-rank 90th percentile of a non-empty collection of latencies"""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, math.ceil(0.9 * len(ordered)) - 1)]
+
+
+class ModelRoute:
+    """Model and limits used for one GroqClient task"""
+
+    def __init__(self, task: str, model: str, max_tokens: int, timeout: float,
+                 fallback_model: Optional[str] = None, latency_slo: Optional[float] = None):
+        self.task = task
+        self.model = model
+        self.max_tokens = max_tokens
+        self.timeout = timeout
+        self.fallback_model = fallback_model if fallback_model != model else None
+        self.latency_slo = latency_slo
+
+    def to_dict(self) -> Dict:
+        return {
+            'model': self.model,
+            'max_tokens': self.max_tokens,
+            'timeout': self.timeout,
+            'fallback_model': self.fallback_model,
+            'latency_slo': self.latency_slo
+        }
+
+
+def _route_from_env(task: str, model: str, max_tokens: int, timeout: float,
+                    fallback_model: Optional[str], latency_slo: float) -> ModelRoute:
+    """Build a route, letting GROQ_ROUTE_<TASK>_<SETTING> environment variables override the defaults"""
+    prefix = f"GROQ_ROUTE_{task.upper()}_"
+    return ModelRoute(
+        task,
+        os.getenv(prefix + 'MODEL', model),
+        int(os.getenv(prefix + 'MAX_TOKENS', max_tokens)),
+        float(os.getenv(prefix + 'TIMEOUT', timeout)),
+        os.getenv(prefix + 'FALLBACK_MODEL', fallback_model or '') or None,
+        float(os.getenv(prefix + 'LATENCY_SLO', latency_slo))
+    )
+
+
+def default_routes() -> Dict[str, ModelRoute]:
+    model = os.getenv('GROQ_MODEL', DEFAULT_MODEL)
+    fast_model = os.getenv('GROQ_FAST_MODEL', DEFAULT_FAST_MODEL)
+    routes = [
+        _route_from_env('summarize_contract', model, 2000, 30, fast_model, 15),
+        _route_from_env('compare_contract_versions', model, 1500, 30, fast_model, 20),
+        _route_from_env('analyze_contract_risk', model, 2000, 45, fast_model, 25),
+        # Template enhancement is rewording, not reasoning; the fast model handles it
+        _route_from_env('enhance_template', fast_model, 4000, 30, None, 20),
+    ]
+    return {route.task: route for route in routes}
+
+
+class ModelRouter:
+    """Chooses the model for each task and falls back to a faster one while the SLO is breached.
+
+    Only calls made with a route's primary model count towards its SLO; a
+    failed call counts as a sample at the route timeout. Latency and outcome of
+    every call are recorded in the metrics registry, labelled by task and model.
+    """
+
+    def __init__(self, routes: Dict[str, ModelRoute]):
+        self.routes = routes
+        self._lock = threading.Lock()
+        self._latencies = {task: deque(maxlen=LATENCY_WINDOW) for task in routes}
+        self._degraded_until = {}
+        self._outcomes = {task: {'requests': 0, 'errors': 0} for task in routes}
+
+    def route(self, task: str) -> ModelRoute:
+        return self.routes[task]
+
+    def is_degraded(self, task: str) -> bool:
+        with self._lock:
+            return self._degraded_until.get(task, 0) > time.monotonic()
+
+    def select_model(self, task: str) -> str:
+        route = self.routes[task]
+        degraded = route.fallback_model is not None and self.is_degraded(task)
+        METRICS.set_gauge('llm_route_degraded', 1 if degraded else 0, task=task)
+        return route.fallback_model if degraded else route.model
+
+    def record(self, task: str, model: str, latency: float, ok: bool):
+        """Record a finished call and move the route to its fallback if the SLO is breached"""
+        METRICS.observe('llm_latency_seconds', latency, task=task, model=model)
+        METRICS.increment('llm_requests_total', task=task, model=model, outcome='ok' if ok else 'error')
+
+        route = self.routes[task]
+        with self._lock:
+            self._outcomes[task]['requests'] += 1
+            if not ok:
+                self._outcomes[task]['errors'] += 1
+        if model != route.model or route.fallback_model is None or not route.latency_slo:
+            return
+
+        with self._lock:
+            samples = self._latencies[task]
+            samples.append(latency if ok else route.timeout)
+            if len(samples) < MIN_SLO_SAMPLES:
+                return
+            latency_p90 = p90(samples)
+            if latency_p90 <= route.latency_slo:
+                return
+            self._degraded_until[task] = time.monotonic() + DEGRADED_SECONDS
+            samples.clear()
+
+        METRICS.increment('llm_route_fallbacks_total', task=task)
+        print(f"[Model router] {task}: p90 {latency_p90:.1f}s over {route.latency_slo}s SLO, "
+              f"using {route.fallback_model} for {DEGRADED_SECONDS}s")
+
+    def stats(self) -> Dict:
+        """Configuration, degraded state, recent primary-model p90 and call outcomes per route"""
+        stats = {}
+        for task, route in self.routes.items():
+            degraded = self.is_degraded(task)
+            with self._lock:
+                samples = list(self._latencies[task])
+                outcomes = dict(self._outcomes[task])
+            stats[task] = dict(
+                route.to_dict(), degraded=degraded, latency_samples=len(samples),
+                latency_p90=p90(samples) if samples else None, **outcomes
+            )
+        return stats
+
+
+ROUTER = ModelRouter(default_routes())
@@ -0,0 +1,139 @@
+# services/rate_limiter.py - Client-Side Rate Limiting for Groq
+import os
+import time
+import threading
+from collections import deque
+from typing import Optional
+from utils.metrics import METRICS
+
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+
+# Lanes in the order they are served; a background call only starts when no interactive call waits
+PRIORITY_LANES = (INTERACTIVE, BACKGROUND)
+
+
+class TokenBucket:
+    """Bucket holding up to ``capacity`` units, refilled continuously at ``rate`` units per second"""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float) -> float:
+        self._refill()
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= amount
+
+    def give_back(self, amount: float):
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+class RateLimiter:
+    """Process-wide requests/min and tokens/min limiter with priority lanes.
+
+    Callers queue in their lane and are admitted strictly in lane order, then
+    FIFO within a lane, once both buckets hold enough budget. Token budget is
+    reserved up front from an estimate and settled against the usage Groq
+    reports. The wait queue is bounded; a full queue or an expired wait makes
+    ``acquire`` return False instead of blocking a worker indefinitely.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, max_queue: int):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+        self.max_queue = max_queue
+        self.blocked_until = 0.0
+        self._cond = threading.Condition()
+        self._lanes = {lane: deque() for lane in PRIORITY_LANES}
+
+    def _head(self):
+        for lane in PRIORITY_LANES:
+            if self._lanes[lane]:
+                return self._lanes[lane][0]
+        return None
+
+    def _queued(self) -> int:
+        return sum(len(queue) for queue in self._lanes.values())
+
+    def _update_gauges(self):
+        for lane in PRIORITY_LANES:
+            METRICS.set_gauge('groq_rate_limit_queue_depth', len(self._lanes[lane]), lane=lane)
+
+    def acquire(self, tokens: int, priority: str = INTERACTIVE, timeout: Optional[float] = None) -> bool:
+        """Wait for budget for one request of about ``tokens`` tokens"""
+        lane = priority if priority in self._lanes else INTERACTIVE
+        ticket = object()
+        started = time.monotonic()
+        deadline = started + timeout if timeout is not None else None
+
+        with self._cond:
+            if self._queued() >= self.max_queue:
+                METRICS.increment('groq_rate_limit_rejected_total', lane=lane, reason='queue_full')
+                print(f"[Rate limit] {lane} call rejected: {self.max_queue} calls already waiting")
+                return False
+
+            self._lanes[lane].append(ticket)
+            self._update_gauges()
+            try:
+                while True:
+                    wait = None
+                    if self._head() is ticket:
+                        wait = max(self.blocked_until - time.monotonic(),
+                                   self.requests.time_until(1),
+                                   self.tokens.time_until(tokens))
+                        if wait <= 0:
+                            self.requests.take(1)
+                            self.tokens.take(tokens)
+                            METRICS.observe('groq_rate_limit_wait_seconds', time.monotonic() - started, lane=lane)
+                            return True
+
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            METRICS.increment('groq_rate_limit_rejected_total', lane=lane, reason='timeout')
+                            print(f"[Rate limit] {lane} call gave up after waiting {timeout:.1f}s")
+                            return False
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                self._lanes[lane].remove(ticket)
+                self._update_gauges()
+                self._cond.notify_all()
+
+    def settle(self, reserved: int, used: int):
+        """Return unused reserved tokens (or charge the overrun) once actual usage is known"""
+        with self._cond:
+            if used < reserved:
+                self.tokens.give_back(reserved - used)
+            else:
+                self.tokens.take(used - reserved)
+            self._cond.notify_all()
+
+    def back_off(self, seconds: float):
+        """Hold every lane after Groq answered 429, honouring its Retry-After"""
+        with self._cond:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        METRICS.increment('groq_rate_limit_429_total')
+
+
+RATE_LIMITER = RateLimiter(
+    requests_per_minute=int(os.getenv('GROQ_REQUESTS_PER_MINUTE', 30)),
+    tokens_per_minute=int(os.getenv('GROQ_TOKENS_PER_MINUTE', 30000)),
+    max_queue=int(os.getenv('GROQ_MAX_QUEUED_CALLS', 50))
+)
+
+# Longest a call waits for rate-limit budget before failing, by lane
+QUEUE_WAIT_SECONDS = {INTERACTIVE: 30.0, BACKGROUND: 300.0}
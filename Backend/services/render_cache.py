@@ -0,0 +1,92 @@
+# services/render_cache.py - Content-Addressed Cache of Rendered Documents
+import os
+import time
+import json
+import uuid
+import hashlib
+from typing import Dict, List, Optional, Tuple
+from flask import current_app
+from document_generator.document_generator import base_docx_digest
+
+
+def render_key(document_json: Dict) -> str:
+    """SHA-256 of the final document JSON and the base document it is rendered onto.
+
+    Equal content on the same base always renders to the same file; replacing
+    templates/base.docx changes every key, so old renders are never served.
+    """
+    key_source = json.dumps({'base': base_docx_digest(), 'document': document_json}, sort_keys=True)
+    return hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """Rendered .docx files stored under the hash of the JSON they were rendered from"""
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    @classmethod
+    def from_app(cls):
+        return cls(current_app.config['RENDER_CACHE_FOLDER'])
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.docx")
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        # Refresh mtime so eviction treats the entry as recently used
+        os.utime(path)
+        return data
+
+    def put(self, key: str, data: bytes):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{uuid.uuid4().hex}.part"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def entries(self) -> List[Tuple[float, int, str]]:
+        """(mtime, size, path) of every cached file, least recently used first"""
+        entries = []
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        return entries
+
+    def evict(self, bytes_to_free: int, grace_seconds: int = 600) -> Dict:
+        """Delete least recently used entries until ``bytes_to_free`` is reclaimed.
+
+        Temp files from interrupted writes are removed once older than ``grace_seconds``.
+        """
+        stats = {'evicted': 0, 'evicted_bytes': 0}
+        cutoff = time.time() - grace_seconds
+        for mtime, size, path in self.entries():
+            if path.endswith('.part'):
+                if mtime >= cutoff:
+                    continue
+            elif stats['evicted_bytes'] >= bytes_to_free:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            stats['evicted'] += 1
+            stats['evicted_bytes'] += size
+
+        for dirpath, dirnames, filenames in os.walk(self.root, topdown=False):
+            if dirpath != self.root and not os.listdir(dirpath):
+                os.rmdir(dirpath)
+        return stats
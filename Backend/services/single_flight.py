@@ -0,0 +1,59 @@
+# services/single_flight.py - Coalescing of Identical In-Flight Calls
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+from utils.metrics import METRICS
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers with the same key share its result.
+
+    The first caller (the leader) runs the function. Callers arriving while it
+    is in flight wait for it instead of starting their own, and the key is
+    forgotten as soon as the leader finishes, so results are never cached.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], Any], wait_timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """Return (result, shared); a follower whose wait expires gets (None, True)"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+            METRICS.set_gauge('singleflight_in_flight', len(self._calls), flight=self.name)
+
+        if not leader:
+            METRICS.increment('singleflight_coalesced_total', flight=self.name)
+            if not call.done.wait(wait_timeout):
+                print(f"[Single flight] {self.name}: gave up waiting for shared call after {wait_timeout:.1f}s")
+                return None, True
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                METRICS.set_gauge('singleflight_in_flight', len(self._calls), flight=self.name)
+            call.done.set()
+            METRICS.increment('singleflight_calls_total', flight=self.name)
+        return call.result, False
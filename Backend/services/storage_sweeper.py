@@ -0,0 +1,127 @@
+# services/storage_sweeper.py - Background Expiry Sweeper and Disk Quota
+import time
+import threading
+import traceback
+from typing import Dict, Optional
+from services.blob_store import BlobStore
+from services.generated_documents import GeneratedDocumentStore
+from services.render_cache import RenderCache
+from utils.metrics import METRICS
+
+
+class StorageSweeper:
+    """Periodically removes expired generated artifacts and enforces a disk quota.
+
+    Each pass deletes generated documents past their expiry, upload spools
+    abandoned in the blob store's temp directory and blobs no contract
+    references any more (past the blob grace period), and then, while generated
+    documents and rendered files together exceed ``quota_bytes``, evicts the
+    least recently used render-cache entries (they can always be re-rendered)
+    followed by the oldest still-valid generated documents. Bytes and file
+    counts per area are exported as ``storage_bytes`` / ``storage_files`` gauges.
+    """
+
+    def __init__(self, generated: GeneratedDocumentStore, render_cache: RenderCache,
+                 blob_store: Optional[BlobStore] = None, quota_bytes: int = 0,
+                 temp_max_age_seconds: int = 3600, interval_seconds: int = 300):
+        self.generated = generated
+        self.render_cache = render_cache
+        self.blob_store = blob_store
+        self.quota_bytes = quota_bytes
+        self.temp_max_age_seconds = temp_max_age_seconds
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_app(cls, app):
+        return cls(
+            GeneratedDocumentStore(app.config['GENERATED_DOCS_FOLDER']),
+            RenderCache(app.config['RENDER_CACHE_FOLDER']),
+            BlobStore(app.config['BLOB_STORE_FOLDER']),
+            quota_bytes=app.config['GENERATED_STORAGE_QUOTA_BYTES'],
+            temp_max_age_seconds=app.config['TEMP_UPLOAD_MAX_AGE_SECONDS'],
+            interval_seconds=app.config['STORAGE_SWEEP_INTERVAL_SECONDS']
+        )
+
+    def run_once(self) -> Dict:
+        started = time.perf_counter()
+        stats = self.generated.sweep()
+        stats['temp_removed'] = self.blob_store.sweep_temp(self.temp_max_age_seconds) if self.blob_store else 0
+        stats['blobs_removed'] = self._collect_blobs()
+
+        documents = self.generated.entries()
+        rendered = self.render_cache.entries()
+        document_bytes = sum(meta['bytes'] for meta in documents)
+        rendered_bytes = sum(size for _, size, _ in rendered)
+
+        stats.update({'evicted': 0, 'evicted_bytes': 0, 'documents_evicted': 0})
+        excess = document_bytes + rendered_bytes - self.quota_bytes if self.quota_bytes else 0
+        if excess > 0:
+            evicted = self.render_cache.evict(excess)
+            stats['evicted'] = evicted['evicted']
+            stats['evicted_bytes'] = evicted['evicted_bytes']
+            rendered_bytes -= evicted['evicted_bytes']
+            excess -= evicted['evicted_bytes']
+            # Still over quota: the oldest download links stop working before the disk fills
+            for meta in sorted(documents, key=lambda meta: meta['created_at']):
+                if excess <= 0:
+                    break
+                self.generated.delete(meta['id'])
+                document_bytes -= meta['bytes']
+                excess -= meta['bytes']
+                stats['documents_evicted'] += 1
+            rendered = self.render_cache.entries()
+            documents = self.generated.entries()
+
+        METRICS.set_gauge('storage_bytes', document_bytes, area='generated')
+        METRICS.set_gauge('storage_files', len(documents), area='generated')
+        METRICS.set_gauge('storage_bytes', rendered_bytes, area='render_cache')
+        METRICS.set_gauge('storage_files', len(rendered), area='render_cache')
+        METRICS.increment('storage_swept_files_total', stats['expired'] + stats['leftovers'], reason='expired')
+        METRICS.increment('storage_swept_files_total', stats['temp_removed'], reason='temp')
+        METRICS.increment('storage_swept_files_total', stats['blobs_removed'], reason='orphaned_blob')
+        METRICS.increment('storage_swept_files_total', stats['evicted'] + stats['documents_evicted'], reason='quota')
+        METRICS.observe('storage_sweep_seconds', time.perf_counter() - started)
+        return stats
+
+    def _collect_blobs(self) -> int:
+        """Reclaim orphaned blobs, including those release() left inside its grace period"""
+        if not self.blob_store:
+            return 0
+        try:
+            return self.blob_store.collect_garbage()['removed']
+        except Exception as e:
+            # The blob pass needs the database; expiry and quota work goes on without it
+            print(f"[Storage sweeper] blob garbage collection failed: {e}")
+            return 0
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                stats = self.run_once()
+                if any(stats.values()):
+                    print(f"[Storage sweeper] {stats}")
+            except Exception as e:
+                print(f"[Storage sweeper] pass failed: {e}")
+                traceback.print_exc()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name='storage-sweeper', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+def start_sweeper(app) -> Optional[StorageSweeper]:
+    """Start the sweeper thread unless disabled with an interval of 0.
+
+    Passes are idempotent, so processes that each start one (several workers,
+    the debug reloader) only repeat harmless work.
+    """
+    if app.config['STORAGE_SWEEP_INTERVAL_SECONDS'] <= 0:
+        return None
+    return StorageSweeper.from_app(app).start()
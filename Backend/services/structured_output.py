@@ -0,0 +1,302 @@
+# services/structured_output.py - Structured LLM Output Parsing
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+from utils.metrics import METRICS
+
+# (section, item, value): item is the member name or list index inside an
+# expanded section, or None when the whole top-level value is emitted at once
+Section = Tuple[str, Optional[object], object]
+
+# Starting braces tried before a response is given up on; bounds the work on prose-heavy output
+MAX_CANDIDATES = 8
+
+_DECODER = json.JSONDecoder()
+
+_LITERAL_FIXES = {'None': 'null', 'True': 'true', 'False': 'false'}
+_CLOSERS = {'{': '}', '[': ']'}
+
+
+class ObjectSchema:
+    """Expected top-level members of an LLM JSON response.
+
+    Missing required members make a response invalid. Optional members of the
+    wrong type are dropped rather than failing the whole response.
+    """
+
+    def __init__(self, name: str, required: Optional[Dict] = None, optional: Optional[Dict] = None):
+        self.name = name
+        self.required = required or {}
+        self.optional = optional or {}
+
+    def validate(self, value) -> Optional[Dict]:
+        if not isinstance(value, dict):
+            return None
+        for key, expected in self.required.items():
+            if not isinstance(value.get(key), expected):
+                return None
+        for key, expected in self.optional.items():
+            if key in value and not isinstance(value[key], expected):
+                del value[key]
+        return value
+
+
+class StructuredResult(dict):
+    """Parsed LLM response that also remembers which model produced it, for cache keys"""
+
+    def __init__(self, value: Dict, model: Optional[str] = None):
+        super().__init__(value)
+        self.model = model
+
+
+NUMBER = (int, float)
+
+RISK_ANALYSIS_SCHEMA = ObjectSchema(
+    'risk_analysis',
+    required={'categories': dict},
+    optional={'overall_risk_score': NUMBER, 'summary': str, 'recommendations': list, 'key_findings': list}
+)
+
+SUMMARY_SCHEMA = ObjectSchema(
+    'summary',
+    required={'summary': str},
+    optional={'explanations': list, 'definitions': list}
+)
+
+COMPARISON_SCHEMA = ObjectSchema(
+    'comparison',
+    required={'summary': str, 'changes': list}
+)
+
+
+def template_schema(template_json: Dict) -> ObjectSchema:
+    """Enhanced templates must keep every top-level key of the template with the same kind of value"""
+    return ObjectSchema('template', required={
+        key: dict if isinstance(value, dict) else list if isinstance(value, list) else object
+        for key, value in template_json.items()
+    })
+
+
+def repair_json(text: str, start: int) -> str:
+    """Best-effort fix of the object starting at ``start``.
+
+    One scan handles the defects models commonly produce: ``#``/``//`` comments
+    copied from the prompt example, Python literals, trailing commas, and output
+    cut off by the token limit (the unfinished member is dropped and the open
+    brackets are closed).
+    """
+    out = []
+    stack = []
+    in_string = escape = False
+    safe_length, safe_stack = 0, []
+    index, length = start, len(text)
+
+    while index < length:
+        char = text[index]
+        if in_string:
+            out.append(char)
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+            index += 1
+            continue
+
+        if char == '"':
+            in_string = True
+            out.append(char)
+        elif char == '#' or text.startswith('//', index):
+            newline = text.find('\n', index)
+            index = length if newline < 0 else newline
+            continue
+        elif char in '{[':
+            stack.append(char)
+            out.append(char)
+        elif char in '}]':
+            # Drop a trailing comma before the closer
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ',':
+                out.pop()
+            if not stack:
+                break
+            stack.pop()
+            out.append(char)
+            safe_length, safe_stack = len(out), list(stack)
+            if not stack:
+                return ''.join(out)
+        elif char == ',':
+            safe_length, safe_stack = len(out), list(stack)
+            out.append(char)
+        elif char.isalpha():
+            word_end = index
+            while word_end < length and text[word_end].isalpha():
+                word_end += 1
+            word = text[index:word_end]
+            out.append(_LITERAL_FIXES.get(word, word))
+            index = word_end
+            continue
+        else:
+            out.append(char)
+        index += 1
+
+    # Truncated: keep everything up to the last complete member and close what is open
+    return ''.join(out[:safe_length]) + ''.join(_CLOSERS[opener] for opener in reversed(safe_stack))
+
+
+def parse_structured(text: str, schema: Optional[ObjectSchema] = None) -> Optional[Dict]:
+    """Extract the first JSON object in an LLM response that satisfies ``schema``.
+
+    Each candidate object is decoded once with ``JSONDecoder.raw_decode``; a
+    candidate that fails to decode gets one local repair attempt before the
+    next ``{`` is tried. Outcomes are counted in the ``llm_parse_total``
+    metric, labelled by schema.
+    """
+    name = schema.name if schema else 'object'
+    if not text:
+        METRICS.increment('llm_parse_total', schema=name, outcome='empty')
+        return None
+
+    position = text.find('{')
+    candidates = 0
+    while position >= 0 and candidates < MAX_CANDIDATES:
+        candidates += 1
+        outcome = 'clean'
+        try:
+            value, end = _DECODER.raw_decode(text, position)
+        except ValueError:
+            value, end = None, position + 1
+            repaired = repair_json(text, position)
+            if repaired:
+                try:
+                    value = _DECODER.raw_decode(repaired)[0]
+                    outcome = 'repaired'
+                except ValueError:
+                    pass
+
+        if value is not None:
+            valid = schema.validate(value) if schema else (value if isinstance(value, dict) else None)
+            if valid is not None:
+                METRICS.increment('llm_parse_total', schema=name, outcome=outcome)
+                return valid
+            METRICS.increment('llm_parse_schema_mismatch_total', schema=name)
+
+        position = text.find('{', end)
+
+    METRICS.increment('llm_parse_total', schema=name, outcome='failed')
+    print(f"[Structured output] no valid {name} object in {len(text)} chars of response")
+    return None
+
+
+class IncrementalJSONObjectParser:
+    """Parses a streamed JSON object and reports members as soon as they are complete.
+
+    Text is scanned once as it arrives. Each top-level member is emitted when
+    its closing delimiter is seen; members listed in ``expand_keys`` are
+    emitted item by item instead (object members or array elements), so a
+    long "categories" or "explanations" section can be shown while it is
+    still being generated. Leading prose before the first ``{`` is ignored.
+    """
+
+    def __init__(self, expand_keys: Iterable[str] = ()):
+        self.expand_keys = set(expand_keys)
+        self.buffer = ''
+        self.position = 0
+        self.started = False
+        self.finished = False
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.member_start = 0
+        self.value_start = None
+        self.key = None
+        self.child_start = None
+        self.child_is_object = False
+        self.emitted_index = 0
+
+    def feed(self, text: str) -> List[Section]:
+        """Add streamed text and return the sections completed by it"""
+        self.buffer += text
+        sections = []
+        buffer = self.buffer
+
+        while self.position < len(buffer) and not self.finished:
+            char = buffer[self.position]
+            index = self.position
+            self.position += 1
+
+            if not self.started:
+                if char == '{':
+                    self.started = True
+                    self.depth = 1
+                    self.member_start = index + 1
+                continue
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == '\\':
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+                continue
+
+            if char == '"':
+                self.in_string = True
+            elif char == ':' and self.depth == 1 and self.value_start is None:
+                self.key = self._load(buffer[self.member_start:index])
+                self.value_start = index + 1
+            elif char in '{[':
+                self.depth += 1
+                if self.depth == 2 and self.key in self.expand_keys:
+                    self.child_start = index + 1
+                    self.child_is_object = char == '{'
+                    self.emitted_index = 0
+            elif char in '}]':
+                if self.depth == 2 and self.child_start is not None:
+                    self._emit_child(buffer[self.child_start:index], sections)
+                    self.child_start = None
+                self.depth -= 1
+                if self.depth == 0:
+                    self._emit_member(buffer[self.value_start or index:index], sections)
+                    self.finished = True
+            elif char == ',':
+                if self.depth == 1:
+                    self._emit_member(buffer[self.value_start or index:index], sections)
+                    self.member_start = index + 1
+                    self.value_start = None
+                    self.key = None
+                elif self.depth == 2 and self.child_start is not None:
+                    self._emit_child(buffer[self.child_start:index], sections)
+                    self.child_start = index + 1
+
+        return sections
+
+    @staticmethod
+    def _load(fragment: str):
+        try:
+            return json.loads(fragment)
+        except ValueError:
+            return None
+
+    def _emit_member(self, value_text: str, sections: List[Section]):
+        if self.key is None or self.key in self.expand_keys or not value_text.strip():
+            return
+        try:
+            sections.append((self.key, None, json.loads(value_text)))
+        except ValueError:
+            pass
+
+    def _emit_child(self, child_text: str, sections: List[Section]):
+        if not child_text.strip():
+            return
+        try:
+            if self.child_is_object:
+                for name, value in json.loads('{' + child_text + '}').items():
+                    sections.append((self.key, name, value))
+            else:
+                sections.append((self.key, self.emitted_index, json.loads(child_text)))
+                self.emitted_index += 1
+        except ValueError:
+            pass
@@ -0,0 +1,52 @@
+# services/summary_service.py - Persisted Contract Summaries
+from typing import Iterator, Optional, Tuple
+from models.contract_summary import ContractSummary
+from services.groq_client import GroqClient
+from services.rate_limiter import BACKGROUND
+
+
+def get_or_create_summary(contract_id: str, content_text: str, text_hash: str,
+                          groq: Optional[GroqClient] = None) -> Tuple[Optional[dict], bool]:
+    """Return the stored summary of a contract, generating and storing it on a miss.
+
+    The second value tells whether the summary came from storage.
+    """
+    groq = groq or GroqClient()
+    model = groq.model_for('summarize_contract')
+    summary = ContractSummary.find(contract_id, text_hash, groq.SUMMARY_PROMPT_VERSION, model)
+    if summary is not None:
+        return summary, True
+
+    summary = groq.summarize_contract(content_text)
+    if summary:
+        # Stored under the model that wrote it; a fallback-model summary is not served as the primary's
+        ContractSummary.save(contract_id, text_hash, groq.SUMMARY_PROMPT_VERSION,
+                             groq.produced_by(summary, 'summarize_contract'), summary)
+    return summary, False
+
+
+def pregenerate_summary(contract_id: str, content_text: str, text_hash: str):
+    """Warm the summary of a freshly uploaded contract so the first view is served from storage"""
+    summary, cached = get_or_create_summary(contract_id, content_text, text_hash,
+                                            GroqClient(priority=BACKGROUND))
+    if summary and not cached:
+        print(f"[Summary] Pre-generated summary for contract {contract_id}")
+
+
+def stream_summary(contract_id: str, content_text: str, text_hash: str,
+                   groq: Optional[GroqClient] = None) -> Iterator[Tuple[str, object]]:
+    """Stream a contract summary as sections, replaying the stored one when present"""
+    groq = groq or GroqClient()
+    model = groq.model_for('summarize_contract')
+    summary = ContractSummary.find(contract_id, text_hash, groq.SUMMARY_PROMPT_VERSION, model)
+    if summary is not None:
+        for key, value in summary.items():
+            yield 'section', (key, None, value)
+        yield 'done', summary
+        return
+
+    for event, data in groq.stream_summarize_contract(content_text):
+        if event == 'done' and data:
+            ContractSummary.save(contract_id, text_hash, groq.SUMMARY_PROMPT_VERSION,
+                                 groq.produced_by(data, 'summarize_contract'), data)
+        yield event, data
@@ -1,6 +1,9 @@
 # services/text_extractor.py - Text Extraction Service
 import os
-from typing import Optional
+import io
+import zipfile
+from xml.etree.ElementTree import iterparse, ParseError
+from typing import BinaryIO, Optional, Tuple, Union
 
 # PDF text extraction using pypdf2
 try:
@@ -19,7 +22,13 @@ except ImportError:
 # Text file extraction
 import chardet
 
-def extract_text_from_pdf(file_path: str) -> Optional[str]:
+# A source is either a file path or a readable binary stream (e.g. an in-memory upload)
+Source = Union[str, BinaryIO]
+
+def _source_name(source: Source) -> str:
+    return source if isinstance(source, str) else '<stream>'
+
+def extract_text_from_pdf(file_path: Source) -> Optional[str]:
     """Extract text from PDF file using PyPDF2"""
     if not PDF_AVAILABLE:
         print("PyPDF2 not available. PDF extraction disabled.")
@@ -28,22 +37,21 @@ def extract_text_from_pdf(file_path: str) -> Optional[str]:
     try:
         text_content = []
         
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            
-            for page_num in range(len(pdf_reader.pages)):
-                try:
-                    page = pdf_reader.pages[page_num]
-                    page_text = page.extract_text()
+        pdf_reader = PyPDF2.PdfReader(file_path)
+        
+        for page_num in range(len(pdf_reader.pages)):
+            try:
+                page = pdf_reader.pages[page_num]
+                page_text = page.extract_text()
+                
+                if page_text.strip():
+                    if page_num > 0:
+                        text_content.append(f"\n--- Page {page_num + 1} ---\n")
+                    text_content.append(page_text)
                     
-                    if page_text.strip():
-                        if page_num > 0:
-                            text_content.append(f"\n--- Page {page_num + 1} ---\n")
-                        text_content.append(page_text)
-                        
-                except Exception as page_error:
-                    print(f"Failed to extract text from page {page_num + 1}: {page_error}")
-                    continue
+            except Exception as page_error:
+                print(f"Failed to extract text from page {page_num + 1}: {page_error}")
+                continue
         
         if text_content:
             full_text = "\n".join(text_content)
@@ -54,11 +62,83 @@ def extract_text_from_pdf(file_path: str) -> Optional[str]:
         return None
         
     except Exception as e:
-        print(f"PDF text extraction failed for {file_path}: {e}")
+        print(f"PDF text extraction failed for {_source_name(file_path)}: {e}")
         return None
 
-def extract_text_from_docx(file_path: str) -> Optional[str]:
-    """Extract text from Word document (.docx)"""
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_P, _W_T, _W_TAB, _W_BR, _W_CR = (WORD_NS + tag for tag in ('p', 't', 'tab', 'br', 'cr'))
+_W_R, _W_TBL, _W_TR, _W_TC = (WORD_NS + tag for tag in ('r', 'tbl', 'tr', 'tc'))
+_W_BODY = WORD_NS + 'body'
+
+def _iter_docx_blocks(source: Source):
+    """Stream paragraphs and table rows of word/document.xml in document order.
+
+    The XML is parsed incrementally and each top-level block is detached from
+    w:body once emitted, so memory stays flat however long the document is. A table row
+    becomes its non-empty cells joined with " | "; every cell is read once, so
+    merged cells are not repeated, and nested tables end up in their cell.
+    """
+    with zipfile.ZipFile(source) as archive, archive.open('word/document.xml') as xml:
+        paragraphs = []  # text parts of the open paragraphs (text boxes nest them)
+        cells = []       # paragraph texts of the open table cells
+        rows = []        # cell texts of the open table rows
+        runs = 0         # open runs; w:tab outside one is a tab stop definition, not text
+        depth = 0
+        body, body_depth = None, -1
+        for event, elem in iterparse(xml, events=('start', 'end')):
+            tag = elem.tag
+            if event == 'start':
+                depth += 1
+                if tag == _W_BODY:
+                    body, body_depth = elem, depth
+                elif tag == _W_R:
+                    runs += 1
+                elif tag == _W_P:
+                    paragraphs.append([])
+                elif tag == _W_TC:
+                    cells.append([])
+                elif tag == _W_TR:
+                    rows.append([])
+                continue
+
+            depth -= 1
+            if depth == body_depth:
+                # A direct child of w:body has ended; drop it so the tree does not grow with the document
+                del body[:]
+            if tag == _W_R:
+                runs -= 1
+            elif tag == _W_T:
+                if paragraphs and elem.text:
+                    paragraphs[-1].append(elem.text)
+            elif tag == _W_TAB:
+                if paragraphs and runs:
+                    paragraphs[-1].append('\t')
+            elif tag in (_W_BR, _W_CR):
+                if paragraphs and runs:
+                    paragraphs[-1].append('\n')
+            elif tag == _W_P:
+                text = ''.join(paragraphs.pop()).strip()
+                elem.clear()  # paragraphs inside a long table are dropped before the table ends
+                if not text:
+                    continue
+                if cells:
+                    cells[-1].append(text)
+                else:
+                    yield text
+            elif tag == _W_TC:
+                text = '\n'.join(cells.pop()).strip()
+                if text and rows:
+                    rows[-1].append(text)
+            elif tag == _W_TR:
+                row = rows.pop()
+                if not row:
+                    continue
+                if cells:
+                    cells[-1].append(' | '.join(row))
+                else:
+                    yield ' | '.join(row)
+
+def _extract_docx_with_python_docx(file_path: Source) -> Optional[str]:
     if not DOCX_AVAILABLE:
         print("python-docx not available. DOCX extraction disabled.")
         return None
@@ -88,53 +168,116 @@ def extract_text_from_docx(file_path: str) -> Optional[str]:
         return None
         
     except Exception as e:
-        print(f"DOCX text extraction failed for {file_path}: {e}")
+        print(f"DOCX text extraction failed for {_source_name(file_path)}: {e}")
         return None
 
-def extract_text_from_txt(file_path: str) -> Optional[str]:
+def extract_text_from_docx(file_path: Source) -> Optional[str]:
+    """Extract text from Word document (.docx)
+
+    Streams the document XML directly; files it cannot read (no
+    word/document.xml, malformed XML) are retried through python-docx.
+    """
+    try:
+        text_content = list(_iter_docx_blocks(file_path))
+        return "\n".join(text_content) if text_content else None
+    except (zipfile.BadZipFile, KeyError, ParseError) as e:
+        print(f"Streaming DOCX extraction failed for {_source_name(file_path)}, using python-docx: {e}")
+        if not isinstance(file_path, str):
+            file_path.seek(0)
+        return _extract_docx_with_python_docx(file_path)
+
+# Byte-order marks checked before anything else; utf-8-sig strips the UTF-8 BOM
+TEXT_BOMS = (
+    (b'\xef\xbb\xbf', 'utf-8-sig'),
+    (b'\xff\xfe\x00\x00', 'utf-32'),
+    (b'\x00\x00\xfe\xff', 'utf-32'),
+    (b'\xff\xfe', 'utf-16'),
+    (b'\xfe\xff', 'utf-16'),
+)
+
+# Bytes handed to chardet when a file is not UTF-8; detection cost grows with input size
+CHARDET_SAMPLE_BYTES = 64 * 1024
+
+def decode_text(raw_data: bytes) -> Tuple[str, str]:
+    """Decode a text file once, returning (encoding, text).
+
+    A BOM decides the encoding outright. Otherwise the bytes are decoded as
+    strict UTF-8, and only if that fails is chardet run on a bounded sample:
+    the start of the file plus the bytes around the first one that is not
+    valid UTF-8, so a long ASCII prefix cannot hide the bytes that decide the
+    encoding.
+    """
+    for bom, encoding in TEXT_BOMS:
+        if raw_data.startswith(bom):
+            return encoding, raw_data.decode(encoding, errors='ignore')
+    try:
+        return 'utf-8', raw_data.decode('utf-8')
+    except UnicodeDecodeError as e:
+        half = CHARDET_SAMPLE_BYTES // 2
+        sample = raw_data[:half]
+        if e.start >= half:
+            sample += b'\n' + raw_data[e.start - half // 2:e.start + half // 2]
+    encoding = chardet.detect(sample).get('encoding')
+    # An ASCII verdict only means the sample missed the 8-bit bytes
+    if not encoding or encoding.lower() == 'ascii':
+        encoding = 'cp1252'
+    return encoding, raw_data.decode(encoding, errors='ignore')
+
+def extract_text_from_txt(file_path: Source) -> Optional[str]:
     """Extract text from plain text file with encoding detection"""
     try:
-        # Detect file encoding
-        with open(file_path, 'rb') as file:
-            raw_data = file.read()
-            encoding_result = chardet.detect(raw_data)
-            encoding = encoding_result.get('encoding', 'utf-8')
-        
-        # Read file with detected encoding
-        with open(file_path, 'r', encoding=encoding, errors='ignore') as file:
-            content = file.read()
-            
-            # Clean up the content
-            lines = [line.strip() for line in content.split('\n') if line.strip()]
-            return '\n'.join(lines) if lines else None
+        if isinstance(file_path, str):
+            with open(file_path, 'rb') as file:
+                raw_data = file.read()
+        else:
+            raw_data = file_path.read()
+
+        _, content = decode_text(raw_data)
+
+        # Clean up the content; newlines are translated as text-mode open() did, and only
+        # '\n' splits lines (form feeds and other Unicode line breaks stay inside a line)
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+        lines = [line.strip() for line in content.split('\n') if line.strip()]
+        return '\n'.join(lines) if lines else None
             
     except Exception as e:
-        print(f"TXT text extraction failed for {file_path}: {e}")
+        print(f"TXT text extraction failed for {_source_name(file_path)}: {e}")
         return None
 
-def extract_text_from_file(file_path: str, file_type: str) -> Optional[str]:
-    """Main function to extract text from various file formats"""
-    if not os.path.exists(file_path):
-        print(f"File not found: {file_path}")
-        return None
-    
+def _extract(source: Source, file_type: str) -> Optional[str]:
     # Normalize file type
     file_type = file_type.lower().strip()
     
     try:
         if file_type == 'pdf':
-            return extract_text_from_pdf(file_path)
+            return extract_text_from_pdf(source)
         elif file_type == 'docx':
-            return extract_text_from_docx(file_path)
+            return extract_text_from_docx(source)
         elif file_type == 'txt':
-            return extract_text_from_txt(file_path)
+            return extract_text_from_txt(source)
         elif file_type == 'doc':
-            print(f"Legacy DOC format not supported: {file_path}")
+            print(f"Legacy DOC format not supported: {_source_name(source)}")
             return None
         else:
             print(f"Unsupported file type: {file_type}")
             return None
             
     except Exception as e:
-        print(f"Text extraction failed for {file_path} ({file_type}): {e}")
-        return None
\ No newline at end of file
+        print(f"Text extraction failed for {_source_name(source)} ({file_type}): {e}")
+        return None
+
+def extract_text_from_file(file_path: str, file_type: str) -> Optional[str]:
+    """Main function to extract text from various file formats"""
+    if not os.path.exists(file_path):
+        print(f"File not found: {file_path}")
+        return None
+    
+    return _extract(file_path, file_type)
+
+def extract_text_from_stream(stream: BinaryIO, file_type: str) -> Optional[str]:
+    """Extract text from a readable, seekable binary stream without touching disk"""
+    return _extract(stream, file_type)
+
+def extract_text_from_bytes(data: bytes, file_type: str) -> Optional[str]:
+    """Extract text from an in-memory file body"""
+    return _extract(io.BytesIO(data), file_type)
\ No newline at end of file
@@ -0,0 +1,230 @@
+# services/upload_ingest.py - Streaming Upload Ingestion
+import os
+import hashlib
+import tempfile
+from typing import Optional
+from flask import Request, current_app
+from services.blob_store import BlobStore, StoredBlob
+
+INGEST_EXTENSIONS = {'pdf', 'doc', 'docx', 'txt'}
+
+# Leading bytes each binary format must start with
+MAGIC_SIGNATURES = {
+    'pdf': (b'%PDF-',),
+    'docx': (b'PK\x03\x04',),
+    'doc': (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1',),
+}
+
+# UTF-16 text legitimately contains NUL bytes, so a BOM exempts it from the binary check
+TEXT_BOMS = (b'\xff\xfe', b'\xfe\xff')
+
+SNIFF_BYTES = 512
+
+
+class UploadRejected(Exception):
+    """Raised while an upload is still streaming in once it is known to be unacceptable"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def _check_signature(file_type: str, head: bytes):
+    if file_type == 'txt':
+        if b'\x00' in head and not head.startswith(TEXT_BOMS):
+            raise UploadRejected('File content does not match the .txt extension', 415)
+        return
+    signatures = MAGIC_SIGNATURES.get(file_type, ())
+    if signatures and not head.startswith(signatures):
+        raise UploadRejected(f'File content does not match the .{file_type} extension', 415)
+
+
+class IngestingFile:
+    """Upload spool that hashes, size-checks and sniffs the body as it is written.
+
+    Werkzeug's multipart parser writes each chunk of the request stream straight
+    into this object, so an oversize or mislabelled file is rejected after the
+    first offending chunk instead of after the whole body has landed on disk.
+    """
+
+    def __init__(self, temp_path: Optional[str], extension: str, max_bytes: int = 0,
+                 spool_max_memory: int = 0):
+        self.temp_path = temp_path
+        self.extension = extension
+        self.file_type = extension.lstrip('.')
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._digest = hashlib.sha256()
+        self._head = b''
+        self._sniffed = False
+        self._stored = False
+        if temp_path is None:
+            # Ephemeral uploads stay in memory and only spill to an anonymous temp file when large
+            self._file = tempfile.SpooledTemporaryFile(max_size=spool_max_memory)
+        else:
+            self._file = open(temp_path, 'w+b')
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        if self.max_bytes and self.size > self.max_bytes:
+            self.discard()
+            raise UploadRejected('File exceeds the maximum upload size', 413)
+
+        if not self._sniffed:
+            self._head += data[:SNIFF_BYTES - len(self._head)]
+            if len(self._head) >= SNIFF_BYTES:
+                self._sniff()
+
+        self._digest.update(data)
+        return self._file.write(data)
+
+    def _sniff(self):
+        self._sniffed = True
+        try:
+            _check_signature(self.file_type, self._head)
+        except UploadRejected:
+            self.discard()
+            raise
+
+    def finish(self):
+        """Run the checks that need the complete body"""
+        if self.size == 0:
+            self.discard()
+            raise UploadRejected('Uploaded file is empty', 400)
+        if not self._sniffed:
+            self._sniff()
+
+    @property
+    def digest(self) -> str:
+        return self._digest.hexdigest()
+
+    def store(self, blob_store: BlobStore) -> StoredBlob:
+        """Move the spooled upload to its content address in the blob store"""
+        if self.temp_path is None:
+            raise ValueError('In-memory uploads cannot be stored in the blob store')
+        self.finish()
+        self._file.close()
+        self._stored = True
+        return blob_store.adopt(self.temp_path, self.digest, self.size, self.extension)
+
+    def discard(self):
+        if not self._file.closed:
+            self._file.close()
+        if not self._stored and self.temp_path and os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+        self._stored = True
+
+    def close(self):
+        self.discard()
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def seek(self, *args):
+        return self._file.seek(*args)
+
+    def tell(self):
+        return self._file.tell()
+
+    def read(self, *args):
+        return self._file.read(*args)
+
+    def readline(self, *args):
+        return self._file.readline(*args)
+
+    def __iter__(self):
+        return iter(self._file)
+
+    def __getattr__(self, name):
+        # Anything not wrapped above (seekable, readable, fileno, ...) comes from the backing file
+        if name == '_file':
+            raise AttributeError(name)
+        return getattr(self._file, name)
+
+
+def ingest_upload(file_storage, blob_store: BlobStore, max_bytes: int = 0) -> StoredBlob:
+    """Store an uploaded file in the blob store.
+
+    Uploads parsed by IngestRequest are already hashed and checked on disk;
+    anything else (e.g. a spool created outside a request) is copied through
+    an IngestingFile chunk by chunk so it gets the same checks.
+    """
+    stream = file_storage.stream
+    if isinstance(stream, IngestingFile):
+        return stream.store(blob_store)
+
+    extension = os.path.splitext(file_storage.filename or '')[1].lower()
+    spool = IngestingFile(blob_store.new_temp_path(extension), extension, max_bytes)
+    try:
+        while True:
+            chunk = stream.read(64 * 1024)
+            if not chunk:
+                break
+            spool.write(chunk)
+        return spool.store(blob_store)
+    finally:
+        spool.discard()
+
+
+def open_ephemeral_upload(file_storage, max_bytes: int = 0, spool_max_memory: int = 0) -> IngestingFile:
+    """Checked, rewound stream of an upload that is processed and then thrown away"""
+    stream = file_storage.stream
+    if not isinstance(stream, IngestingFile):
+        extension = os.path.splitext(file_storage.filename or '')[1].lower()
+        spool = IngestingFile(None, extension, max_bytes, spool_max_memory)
+        while True:
+            chunk = stream.read(64 * 1024)
+            if not chunk:
+                break
+            spool.write(chunk)
+        stream = spool
+    stream.finish()
+    stream.seek(0)
+    return stream
+
+
+def ephemeral_upload(view):
+    """Mark a view whose uploads are extracted from memory and never stored"""
+    view.ephemeral_upload = True
+    return view
+
+
+def batch_upload(view):
+    """Mark a view that accepts many files per request, allowing BATCH_MAX_CONTENT_LENGTH bodies"""
+    view.batch_upload = True
+    return view
+
+
+class IngestRequest(Request):
+    """Request class that spools contract uploads through IngestingFile"""
+
+    def _view(self):
+        return current_app.view_functions.get(self.endpoint) if current_app else None
+
+    @property
+    def max_content_length(self):
+        if getattr(self._view(), 'batch_upload', False):
+            return current_app.config.get('BATCH_MAX_CONTENT_LENGTH')
+        return super().max_content_length
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        extension = os.path.splitext(filename or '')[1].lower()
+        if extension.lstrip('.') not in INGEST_EXTENSIONS:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+
+        max_bytes = current_app.config.get('MAX_UPLOAD_FILE_SIZE', 0)
+        if getattr(self._view(), 'ephemeral_upload', False):
+            spool = IngestingFile(None, extension, max_bytes,
+                                  current_app.config.get('EPHEMERAL_SPOOL_MAX_MEMORY', 0))
+        else:
+            spool = IngestingFile(BlobStore.from_app().new_temp_path(extension), extension, max_bytes)
+        self.__dict__.setdefault('_ingest_spools', []).append(spool)
+        return spool
+
+    def close(self):
+        super().close()
+        # Spools from a parse that was aborted never reach request.files
+        for spool in self.__dict__.get('_ingest_spools', ()):
+            spool.discard()
@@ -0,0 +1,50 @@
+# utils/metrics.py - In-Process Metrics
+import threading
+from typing import Dict
+
+
+def _metric_key(name: str, labels: Dict) -> str:
+    if not labels:
+        return name
+    label_text = ','.join(f"{key}={labels[key]}" for key in sorted(labels))
+    return f"{name}{{{label_text}}}"
+
+
+class MetricsRegistry:
+    """Thread-safe counters, gauges and value observations for this worker process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._observations = {}
+
+    def increment(self, name: str, value: float = 1, **labels):
+        key = _metric_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        key = _metric_key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name: str, value: float, **labels):
+        """Record one sample (e.g. a latency); count, sum and max are kept"""
+        key = _metric_key(name, labels)
+        with self._lock:
+            stats = self._observations.setdefault(key, {'count': 0, 'sum': 0.0, 'max': 0.0})
+            stats['count'] += 1
+            stats['sum'] += value
+            stats['max'] = max(stats['max'], value)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                'counters': dict(self._counters),
+                'gauges': dict(self._gauges),
+                'observations': {key: dict(stats) for key, stats in self._observations.items()}
+            }
+
+
+METRICS = MetricsRegistry()
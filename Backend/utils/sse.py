@@ -0,0 +1,28 @@
+# utils/sse.py - Server-Sent Events Helpers
+import json
+from flask import Response, stream_with_context
+
+def format_sse(event: str, data) -> str:
+    """Encode one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def sse_response(events) -> Response:
+    """Relay ('section', (key, item, value)) and ('done', result) events to the browser.
+
+    A 'done' event without a result is sent as an 'error' event instead.
+    """
+    def generate():
+        for event, data in events:
+            if event == 'section':
+                section, item, value = data
+                yield format_sse('section', {'section': section, 'item': item, 'value': value})
+            elif event == 'done' and data is None:
+                yield format_sse('error', {'error': 'Generation failed'})
+            else:
+                yield format_sse(event, data)
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response